@@ -0,0 +1,155 @@
+# Bounding box helpers shared by the OCR processors # bbox_utils.py
+import numpy as np
+from typing import List, Optional, Tuple
+
+try:
+    from numba import njit  # Optional: compiles the bbox packing kernel
+except ImportError:
+    njit = None
+
+_INT32_MAX = np.iinfo(np.int32).max
+
+def _pack_bboxes_numpy(points):
+    """NumPy version of _pack_bboxes, used when numba is not installed"""
+    valid = (np.abs(points) <= _INT32_MAX).all(axis=(1, 2))  # False for NaN too
+    return np.where(valid[:, None, None], points, 0).astype(np.int32), valid
+
+if njit is not None:
+    @njit(cache=True)
+    def _pack_bboxes(points):
+        """
+        Truncate an (N, 4, 2) float array of boxes to int32 in a single pass.
+
+        Boxes with a coordinate that int() would reject or int32 can't hold
+        (NaN, inf, out of range) are flagged as invalid instead of wrapping.
+        """
+        n, n_points, n_dims = points.shape
+        out = np.zeros((n, n_points, n_dims), dtype=np.int32)
+        valid = np.ones(n, dtype=np.bool_)
+        for i in range(n):
+            for j in range(n_points):
+                for k in range(n_dims):
+                    v = points[i, j, k]
+                    if not abs(v) <= _INT32_MAX:
+                        valid[i] = False
+                    else:
+                        out[i, j, k] = int(v)
+        return out, valid
+else:
+    _pack_bboxes = _pack_bboxes_numpy
+
+def _to_lists(points) -> List[Optional[List[List[int]]]]:
+    """Pack a (N, 4, 2) float array and convert it back to nested lists"""
+    packed, valid = _pack_bboxes(points)
+    return [bbox if ok else None for bbox, ok in zip(packed.tolist(), valid.tolist())]
+
+def suppress_overlapping(bboxes: List, scores: List[float], overlap_threshold: float = 0.5) -> List[int]:
+    """
+    Greedy non-maximum suppression on the axis-aligned extents of the boxes.
+
+    Overlap is measured against the smaller of the two boxes (rather than their
+    union), so a fragment of a word lying inside the whole word's box counts
+    as a duplicate even though it covers only part of it.
+
+    Args:
+        bboxes (List): One box per detection, each a list of [x, y] points.
+        scores (List[float]): Priority of each detection; higher is kept first.
+        overlap_threshold (float): Boxes with more than this fraction of the smaller
+            box's area inside a better-scored kept box are dropped.
+
+    Returns:
+        List[int]: Indices of the kept boxes, in their original order.
+    """
+    if not len(bboxes):
+        return []
+    rects = np.array([[min(p[0] for p in box), min(p[1] for p in box),
+                       max(p[0] for p in box), max(p[1] for p in box)] for box in bboxes],
+                     dtype=np.float64)
+    areas = (rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])
+    order = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")
+    keep = []
+    while len(order):
+        best, rest = order[0], order[1:]
+        keep.append(int(best))
+        width = np.minimum(rects[best, 2], rects[rest, 2]) - np.maximum(rects[best, 0], rects[rest, 0])
+        height = np.minimum(rects[best, 3], rects[rest, 3]) - np.maximum(rects[best, 1], rects[rest, 1])
+        inter = np.clip(width, 0, None) * np.clip(height, 0, None)
+        smaller = np.minimum(areas[best], areas[rest])
+        overlap = np.divide(inter, smaller, out=np.zeros_like(inter), where=smaller > 0)
+        order = rest[overlap <= overlap_threshold]
+    return sorted(keep)
+
+def int_bboxes(bbox_coords: List) -> List[Optional[List[List[int]]]]:
+    """
+    Truncates OCR bounding boxes to integer pixel coordinates.
+
+    All boxes are parsed into one (N, 4, 2) float64 array and truncated toward
+    zero like int() in a single compiled pass (a NumPy cast without numba).
+    Only the first 4 points of each box are kept. Boxes that are malformed or
+    have non-finite coordinates come back as None; if the boxes don't form a
+    regular array, they are converted one at a time.
+
+    Args:
+        bbox_coords (List): One box per detection, each a list of [x, y] points.
+
+    Returns:
+        List[Optional[List[List[int]]]]: The boxes as nested lists of ints.
+    """
+    try:
+        points = np.array([coords[:4] for coords in bbox_coords], dtype=np.float64)
+        if points.ndim == 3:
+            return _to_lists(points)
+        if not len(points):
+            return []
+    except (ValueError, TypeError):
+        pass
+
+    # Ragged input: convert box by box so one bad box doesn't drop the whole page
+    bboxes = []
+    for coords in bbox_coords:
+        try:
+            points = np.array(coords[:4], dtype=np.float64)
+            if points.ndim != 2:
+                raise ValueError(f"expected a list of points, got shape {points.shape}")
+            bboxes.extend(_to_lists(points[None]))
+        except (ValueError, TypeError) as e:
+            print(f"    [WARNING] Failed to convert bounding box: {e}")
+            bboxes.append(None)
+    return bboxes
+
+def int_bbox_array(bbox_coords: List) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Truncates quadrilateral OCR bounding boxes to one int32 array.
+
+    Like int_bboxes, but the boxes stay packed as an (N, 4, 2) array instead of
+    being converted back to nested lists. Boxes that are malformed, have
+    non-finite coordinates or don't have 4 [x, y] points are zero rows marked
+    False in the returned mask.
+
+    Args:
+        bbox_coords (List): One box per detection, each a list of [x, y] points.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (N, 4, 2) int32 boxes and an (N,) bool mask of the valid ones.
+    """
+    n_boxes = len(bbox_coords)
+    try:
+        points = np.array([coords[:4] for coords in bbox_coords], dtype=np.float64)
+        if points.shape == (n_boxes, 4, 2):
+            return _pack_bboxes(points)
+    except (ValueError, TypeError):
+        pass
+
+    # Ragged input: convert box by box so one bad box doesn't drop the whole page
+    packed = np.zeros((n_boxes, 4, 2), dtype=np.int32)
+    valid = np.zeros(n_boxes, dtype=np.bool_)
+    for i, coords in enumerate(bbox_coords):
+        try:
+            points = np.array(coords[:4], dtype=np.float64)
+            if points.shape != (4, 2):
+                raise ValueError(f"expected 4 [x, y] points, got shape {points.shape}")
+            box, ok = _pack_bboxes(points[None])
+            packed[i], valid[i] = box[0], ok[0]
+        except (ValueError, TypeError) as e:
+            print(f"    [WARNING] Failed to convert bounding box: {e}")
+    return packed, valid
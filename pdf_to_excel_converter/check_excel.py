@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Check generated Excel outputs.
+
+Single entry point for the check_* scripts, so checking several outputs in
+one run pays the pandas import only once.
+"""
+
+import os
+import re
+import sys
+import argparse
+
+def _report_ai(df, excel_path):
+    print('🎯 AI ANALYSIS:')
+    print(f'✅ Automatically detected {len(df.columns)} columns')
+    print(f'✅ Extracted {len(df)} data rows')
+    print('✅ No hardcoding used - pure AI detection!')
+
+def _report_final(df, excel_path):
+    print('✅ SUCCESS: Your PDF has been converted to a properly structured Excel file!')
+    print(f'📁 File location: {excel_path}')
+
+def _report_improved(df, excel_path):
+    print('🎯 IMPROVEMENT ANALYSIS:')
+    print(f'✅ Detected {len(df.columns)} columns automatically')
+    print(f'✅ Extracted {len(df)} clean data rows')
+    print('✅ Improved column alignment and data cleaning')
+    print('✅ Removed noise and invalid rows')
+    print('🤖 100% AI-powered - no hardcoding!')
+
+def _report_output(df, excel_path):
+    print('Data types:')
+    print(df.dtypes)
+
+def _report_v2(df, excel_path):
+    print('🎯 SUCCESS ANALYSIS:')
+    print('✅ AI detected the SAME column structure automatically')
+    print('✅ Extracted the NEW part values without any code changes')
+    print('✅ Proves the system is truly adaptive and non-hardcoded!')
+    print()
+    print('🚀 COMPARISON WITH EXPECTED NEW VALUES:')
+    expected_parts = ['PN-967-X', 'PN-143-Z', 'PN-758-K', 'PN-392-M', 'PN-615-P', 'PN-824-R', 'PN-456-T']
+    print(f'Expected new part numbers: {expected_parts}')
+
+    if 'Part' in df.columns:
+        extracted_parts = df['Part'].dropna().tolist()
+        print(f'AI extracted parts: {extracted_parts}')
+
+        # OCR can leave extra text around a part number, so match substrings in one scan
+        expected_re = re.compile('|'.join(map(re.escape, expected_parts)))
+        matches = sum(1 for part in extracted_parts if expected_re.search(str(part)))
+        print(f'✅ Successfully matched {matches}/{len(expected_parts)} new part numbers!')
+
+# Number of data rows read by checks that only sample the sheet
+SAMPLE_ROWS = 100
+
+# Check name -> (Excel path, banner, rule width, show column list, sample only, report function)
+CHECKS = {
+    'ai': ("output_excel/ai_manufacturing_parts.xlsx", '🤖 AI-DETECTED TABLE STRUCTURE:', 60, True, False, _report_ai),
+    'final': ("output_excel/manufacturing_parts_final.xlsx", '🎉 FINAL Manufacturing Parts Data:', 70, False, False, _report_final),
+    'improved': ("output_excel/ai_manufacturing_improved.xlsx", '🚀 IMPROVED AI-DETECTED TABLE:', 60, True, False, _report_improved),
+    # Only prints column types, so inferring them from a sample is enough
+    'output': ("output_excel/manufacturing_parts_structured.xlsx", 'Structured Manufacturing Parts Data:', 60, True, True, _report_output),
+    'v2': ("output_excel/v2_extracted.xlsx", '🤖 AI EXTRACTION RESULTS FROM V2.PDF:', 60, True, False, _report_v2),
+}
+
+def _load_sample(excel_path: str):
+    """Read up to SAMPLE_ROWS data rows; returns the sample DataFrame and the full sheet shape"""
+    import pandas as pd
+    from xlsx_cache import read_xlsx_sample
+
+    headers, rows, shape = read_xlsx_sample(excel_path, SAMPLE_ROWS)
+    return pd.DataFrame(rows, columns=headers), shape
+
+def run_check(name: str, pretty: bool = False):
+    """
+    Print the contents and analysis for one of the known Excel outputs.
+
+    The table is written as tab-separated values by default, which goes through
+    pandas' C writer; pass pretty=True for the aligned to_string layout.
+    Errors reading the file propagate to the caller.
+    """
+    excel_path, banner, rule_width, show_columns, sample_only, report = CHECKS[name]
+    if not os.path.exists(excel_path):
+        print(f"Excel file not found: {excel_path}")
+        return
+
+    # Imported here so pandas is only loaded once there is a file to read
+    from xlsx_cache import cached_read_excel
+
+    if sample_only:
+        df, shape = _load_sample(excel_path)
+    else:
+        df = cached_read_excel(excel_path)
+        shape = df.shape
+    header_lines = [banner, '=' * rule_width, f'Shape: {shape} (rows, columns)']
+    if show_columns:
+        header_lines.append(f'Columns: {list(df.columns)}')
+    sys.stdout.write('\n'.join(header_lines) + '\n\n')
+    if pretty:
+        # Format straight into stdout rather than building the table string first
+        df.to_string(buf=sys.stdout, index=False)
+        sys.stdout.write('\n\n')
+    else:
+        df.to_csv(sys.stdout, sep='\t', index=False, header=True)
+        sys.stdout.write('\n')
+    if len(df) < shape[0]:
+        print(f"... and {shape[0] - len(df)} more rows\n")
+    report(df, excel_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check generated Excel outputs.")
+    parser.add_argument("which", nargs="+", choices=sorted(CHECKS),
+                        help="Which output(s) to check.")
+    parser.add_argument("--pretty", action="store_true",
+                        help="Print aligned tables instead of tab-separated values.")
+    args = parser.parse_args(argv)
+
+    for name in args.which:
+        run_check(name, pretty=args.pretty)
+
+if __name__ == "__main__":
+    main()
@@ -3,36 +3,13 @@
 Check the improved AI results
 """
 
-import pandas as pd
-import os
+import sys
 
-def check_improved_results():
+from check_excel import main, run_check
+
+def check_improved_results(pretty: bool = False):
     """Check the improved AI-generated Excel output"""
-    try:
-        excel_path = "output_excel/ai_manufacturing_improved.xlsx"
-        if not os.path.exists(excel_path):
-            print(f"Excel file not found: {excel_path}")
-            return
-        
-        df = pd.read_excel(excel_path)
-        print('🚀 IMPROVED AI-DETECTED TABLE:')
-        print('=' * 60)
-        print(f'Shape: {df.shape} (rows, columns)')
-        print(f'Columns: {list(df.columns)}')
-        print()
-        print(df.to_string(index=False))
-        print()
-        print('🎯 IMPROVEMENT ANALYSIS:')
-        print(f'✅ Detected {len(df.columns)} columns automatically')
-        print(f'✅ Extracted {len(df)} clean data rows')
-        print('✅ Improved column alignment and data cleaning')
-        print('✅ Removed noise and invalid rows')
-        print('🤖 100% AI-powered - no hardcoding!')
-        
-    except Exception as e:
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+    run_check('improved', pretty=pretty)
 
 if __name__ == "__main__":
-    check_improved_results() 
\ No newline at end of file
+    main(['improved'] + sys.argv[1:])
@@ -3,45 +3,13 @@
 Check the v2.pdf AI extraction results
 """
 
-import pandas as pd
-import os
+import sys
 
-def check_v2_results():
+from check_excel import main, run_check
+
+def check_v2_results(pretty: bool = False):
     """Check the v2.pdf AI extraction results"""
-    try:
-        excel_path = "output_excel/v2_extracted.xlsx"
-        if not os.path.exists(excel_path):
-            print(f"Excel file not found: {excel_path}")
-            return
-        
-        df = pd.read_excel(excel_path)
-        print('🤖 AI EXTRACTION RESULTS FROM V2.PDF:')
-        print('=' * 60)
-        print(f'Shape: {df.shape} (rows, columns)')
-        print(f'Columns: {list(df.columns)}')
-        print()
-        print(df.to_string(index=False))
-        print()
-        print('🎯 SUCCESS ANALYSIS:')
-        print('✅ AI detected the SAME column structure automatically')
-        print('✅ Extracted the NEW part values without any code changes')
-        print('✅ Proves the system is truly adaptive and non-hardcoded!')
-        print()
-        print('🚀 COMPARISON WITH EXPECTED NEW VALUES:')
-        expected_parts = ['PN-967-X', 'PN-143-Z', 'PN-758-K', 'PN-392-M', 'PN-615-P', 'PN-824-R', 'PN-456-T']
-        print(f'Expected new part numbers: {expected_parts}')
-        
-        if 'Part' in df.columns:
-            extracted_parts = df['Part'].dropna().tolist()
-            print(f'AI extracted parts: {extracted_parts}')
-            
-            matches = sum(1 for part in extracted_parts if any(exp in str(part) for exp in expected_parts))
-            print(f'✅ Successfully matched {matches}/{len(expected_parts)} new part numbers!')
-        
-    except Exception as e:
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+    run_check('v2', pretty=pretty)
 
 if __name__ == "__main__":
-    check_v2_results() 
\ No newline at end of file
+    main(['v2'] + sys.argv[1:])
@@ -1,8 +1,20 @@
 # Configuration settings # config.py
+import os
 
 # Directory to store temporary images extracted from PDF
 TEMP_IMAGE_DIR = "temp_images"
 
+# Format of the page images written to TEMP_IMAGE_DIR: "jpeg" (at TEMP_IMAGE_QUALITY)
+# or "png". A 300 DPI page takes far longer to deflate as PNG than to encode as
+# JPEG, and the file is several times larger
+TEMP_IMAGE_FORMAT = "jpeg"
+TEMP_IMAGE_QUALITY = 92
+TEMP_IMAGE_EXTENSION = {"jpeg": "jpg", "png": "png"}[TEMP_IMAGE_FORMAT]
+
+# The conversion pipelines hand pages to OCR as in-memory arrays and write no
+# images; set this to also save each page to TEMP_IMAGE_DIR/debug for inspection
+DEBUG_SAVE_IMAGES = False
+
 # Directory to store output Excel files
 OUTPUT_DIR = "output_excel"
 
@@ -23,14 +35,66 @@ COLUMN_MAPPINGS = {
 
 # OCR Model Configuration
 # lang: 'en' for English, 'ch' for Chinese, etc.
-# use_angle_cls: True for angle classification (detects rotated text)
+# use_angle_cls: True to run PaddleOCR's angle classifier (detects rotated text) on every
+#   page. Born-digital pages render with axis-aligned text, so by default it only runs on
+#   pages that look scanned (an image and no text layer). Telling them apart needs PyMuPDF;
+#   without it every page is read with the classifier
 # use_gpu: Set to True if you have a compatible GPU and PaddlePaddle GPU version installed
+# gpu_batch_size: Pages per batched EasyOCR call when running on the GPU
+# rec_batch_size: Text crops the recognizer reads per forward pass (EasyOCR's
+#   batch_size, PaddleOCR's rec_batch_num); larger is faster, especially on the GPU,
+#   at the cost of memory
+# tile_large_pages: Split pages whose long edge exceeds tile_min_size pixels into a
+#   tile_grid of (rows, columns) overlapping tiles and run EasyOCR on them in parallel;
+#   tile_overlap pixels are shared between neighbouring tiles so text on a seam is
+#   seen whole by at least one tile
+# ocr_max_side: Pages (that aren't tiled) are shrunk so their long edge is at most this
+#   many pixels before EasyOCR sees them; 2560 is EasyOCR's own detector canvas size, so
+#   detection is unchanged. None keeps the full resolution
+# max_pages_in_flight: Pages handed to the OCR workers but not yet collected; bounds the
+#   memory held by queued pages (None: twice the number of workers)
+# max_pages_per_second: Rate at which pages are handed to OCR (None: unlimited)
+# retry_confidence: Pages whose mean text confidence is below this are read again at
+#   RETRY_DPI (None: never)
 OCR_CONFIG = {
     "lang": "en",
-    "use_angle_cls": True,
-    "use_gpu": False # Set to True if you have GPU and installed paddlepaddle-gpu
+    "use_angle_cls": False,
+    "use_gpu": False, # Set to True if you have GPU and installed paddlepaddle-gpu
+    "gpu_batch_size": 8,
+    "rec_batch_size": 16,
+    "tile_large_pages": False,
+    "tile_min_size": 4000,
+    "tile_grid": (2, 2),
+    "tile_overlap": 128,
+    "ocr_max_side": 2560,
+    "max_pages_in_flight": None,
+    "max_pages_per_second": None,
+    "retry_confidence": 0.75
 }
 
+# Resolution pages are rendered at before OCR. EasyOCR shrinks pages to ocr_max_side
+# (2560 px, about 220 DPI on A4 or Letter) and PaddleOCR's detector works smaller
+# still, so most pixels of a 300 DPI render were thrown away
+RENDER_DPI = 220
+
+# Render pages in grayscale: a third of the bytes of RGB to render, pass between
+# processes, resize and hash. Both OCR engines recognize text on grayscale crops
+# anyway (EasyOCR's detector gets the gray page expanded back to three channels)
+RENDER_GRAYSCALE = True
+
+# Pages whose mean OCR confidence is below OCR_CONFIG["retry_confidence"] are rendered
+# again at this resolution and read at full size; the better-scored reading is kept
+RETRY_DPI = 300
+
+# OCR boxes are reported in pixels at this resolution whatever DPI a page was rendered
+# at, so the mappers' pixel tolerances don't depend on RENDER_DPI
+COORDINATE_DPI = 300
+
+# Processes rendering pages side by side (pdftoppm processes, or PyMuPDF workers
+# when it is installed); one core is left for the OCR stage, which runs at the
+# same time
+RENDER_THREADS = max(1, (os.cpu_count() or 2) - 1)
+
 # Poppler path for pdf2image (only needed if Poppler is not in PATH)
 # POPPLER_PATH = r"C:\path\to\poppler\bin" # Example for Windows
 POPPLER_PATH = None
\ No newline at end of file
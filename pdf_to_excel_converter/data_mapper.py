@@ -1,13 +1,111 @@
 # Functions for mapping extracted data # data_mapper.py
 import pandas as pd
 import re
+from functools import lru_cache
+from itertools import dropwhile, islice
 from typing import List, Dict, Any
 
 from config import COLUMN_MAPPINGS
+from text_results import TextResults
+
+try:
+    import ahocorasick  # Optional: pyahocorasick speeds up header matching
+except ImportError:
+    ahocorasick = None
+
+# Patterns to identify different types of data, compiled once at import time
+PART_NUMBER_RE = re.compile(r'^PN-[A-Z0-9-]+$', re.IGNORECASE)
+MACHINE_RE = re.compile(r'^M-\d+$')
+NUMBER_RE = re.compile(r'^\d+\.?\d*$')
+TOLERANCE_RE = re.compile(r'^[±+]\d+\.\d+$|^t\d+\.\d+$')
+
+# Integer tags for classified OCR tokens
+TAG_OTHER, TAG_PART, TAG_MACHINE, TAG_NUMBER, TAG_TOLERANCE = range(5)
+
+# Number of cells in a manufacturing table row
+ROW_LENGTH = 6
+
+def _classify_token(text: str) -> int:
+    """Map a cleaned OCR token to its integer tag"""
+    if PART_NUMBER_RE.match(text):
+        return TAG_PART
+    if MACHINE_RE.match(text):
+        return TAG_MACHINE
+    if NUMBER_RE.match(text):
+        return TAG_NUMBER
+    if TOLERANCE_RE.match(text):
+        return TAG_TOLERANCE
+    return TAG_OTHER
+
+def _group_row_starts(tags: List[int], row_length: int) -> List[int]:
+    """
+    Return the token index at which each row starts.
+    
+    A row starts at every part number and spans the next row_length tokens;
+    scanning resumes after the tokens a row consumed.
+    """
+    n = len(tags)
+    starts = []
+    i = 0
+    while i < n:
+        if tags[i] == TAG_PART:
+            starts.append(i)
+            i += min(row_length, n - i)
+        else:
+            i += 1
+    return starts
+
+# OCR noise dropped before row parsing: exact tokens and substrings
+_SKIP_TOKENS = frozenset({'II', 'Log'})
+_SKIP_SUBSTRINGS = ('file://',)
+
+# Character-level OCR fixes applied with a single C-level table lookup
+_DOLLAR_FIX = str.maketrans({'$': '.5'})
+_LETTER_O_FIX = str.maketrans({'o': '0'})
+
+# Per-column substring fixups for common OCR errors. Within a column the
+# entries are tried in order at each position, so longer keys go first.
+COLUMN_FIXUPS = {
+    'Part Number': {'PN-SSI-C': 'PN-551-C', 'PN-I2-D': 'PN-12-D'},
+    'Machine Number': {'M-0S': 'M-05'},
+    'Diameter (mm)': {'$': '.5', 'IS.': '15.'},
+    'Length (cm)': {'$': '.5', 'IS.': '15.'},
+    'Tolerance (mm)': {'t0.0S': '±0.05', 't0.': '±0.', 't': '±'},
+    'Quantity': {'Soo': '500', 'ISO': '150', 'o': '0'},
+}
+_COLUMN_FIXUP_PATTERNS = {
+    col: (re.compile('|'.join(map(re.escape, fixups))), fixups)
+    for col, fixups in COLUMN_FIXUPS.items()
+}
+
+def _build_header_automaton(header_patterns: Dict[str, List[str]]):
+    """Build an Aho-Corasick automaton mapping each header keyword to its column"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for column_name, patterns in header_patterns.items():
+        for pattern in patterns:
+            columns = automaton.get(pattern, ())
+            automaton.add_word(pattern, columns + (column_name,))
+    automaton.make_automaton()
+    return automaton
 
 class DataMapper:
-    def __init__(self):
-        self.column_mappings = COLUMN_MAPPINGS
+    column_mappings = COLUMN_MAPPINGS
+
+    # Expected column headers and their (lowercase) variations, built once per
+    # process rather than on every page
+    _HEADER_PATTERNS = {
+        'Part Number': ['part', 'number', 'pn'],
+        'Machine Number': ['machine', 'number'],
+        'Diameter (mm)': ['diameter', 'mm'],
+        'Length (cm)': ['length', 'cm'],
+        'Tolerance (mm)': ['tolerance', 'mm'],
+        'Quantity': ['quantity']
+    }
+    _HEADER_AUTOMATON = _build_header_automaton(_HEADER_PATTERNS)
+    _COLUMNS = list(_HEADER_PATTERNS)
+    _NUMERIC_COLUMNS = ('Diameter (mm)', 'Length (cm)', 'Quantity')
 
     def process_ocr_outputs(self, text_results: List[Dict], table_results: List[Dict]) -> List[pd.DataFrame]:
         """
@@ -27,7 +125,13 @@ class DataMapper:
             return []
         
         # Extract just the text from OCR results
-        extracted_texts = [result.get('text', '').strip() for result in text_results if result.get('text', '').strip()]
+        # Strip each text once in a generator, then keep only the non-empty ones
+        if isinstance(text_results, TextResults):
+            texts = text_results.text
+        else:
+            texts = (result.get('text', '') for result in text_results)
+        stripped_texts = (text.strip() for text in texts)
+        extracted_texts = [text for text in stripped_texts if text]
         
         print(f"[*] Processing {len(extracted_texts)} text elements")
         
@@ -55,18 +159,8 @@ class DataMapper:
         """
         print("[*] Attempting to parse manufacturing parts table...")
         
-        # Define expected column headers and their variations
-        header_patterns = {
-            'Part Number': ['part', 'number', 'pn'],
-            'Machine Number': ['machine', 'number'],
-            'Diameter (mm)': ['diameter', 'mm'],
-            'Length (cm)': ['length', 'cm'],
-            'Tolerance (mm)': ['tolerance', 'mm'],
-            'Quantity': ['quantity']
-        }
-        
         # Find header positions
-        header_indices = self._find_headers(texts, header_patterns)
+        header_indices = self._find_headers(texts, self._HEADER_PATTERNS, self._HEADER_AUTOMATON)
         
         if not header_indices:
             print("[!] Could not identify table headers")
@@ -74,18 +168,13 @@ class DataMapper:
         
         print(f"[*] Found headers at positions: {header_indices}")
         
-        # Find where data starts (after headers and units)
-        data_start_idx = max(header_indices.values()) + 1
-        
-        # Skip unit indicators like "(mm)", "(cm)" that might appear after headers
-        while data_start_idx < len(texts) and self._is_unit_indicator(texts[data_start_idx]):
-            data_start_idx += 1
+        # Data starts after the headers, skipping unit indicators like "(mm)", "(cm)"
+        header_end_idx = max(header_indices.values()) + 1
+        data_texts = list(dropwhile(self._is_unit_indicator, islice(texts, header_end_idx, None)))
+        data_start_idx = len(texts) - len(data_texts)
         
         print(f"[*] Data starts at index: {data_start_idx}")
         
-        # Extract data rows
-        data_texts = texts[data_start_idx:]
-        
         # Parse data into rows
         rows = self._parse_data_rows(data_texts)
         
@@ -95,35 +184,62 @@ class DataMapper:
         
         print(f"[*] Parsed {len(rows)} data rows")
         
-        # Create DataFrame
-        columns = ['Part Number', 'Machine Number', 'Diameter (mm)', 'Length (cm)', 'Tolerance (mm)', 'Quantity']
-        df = pd.DataFrame(rows, columns=columns)
+        # Create DataFrame; every cell is still a string at this point
+        df = pd.DataFrame.from_records(rows, columns=self._COLUMNS, coerce_float=False)
         
-        # Clean up the data
+        # Clean up the data, then convert the measurement cells that parse as numbers;
+        # the rest (e.g. a misread '1S') keep their text so it can be fixed by hand
         df = self._clean_dataframe(df)
+        for column in self._NUMERIC_COLUMNS:
+            parsed = pd.to_numeric(df[column], errors='coerce').notna()
+            if parsed.all():
+                df[column] = pd.to_numeric(df[column])
+            elif parsed.any():
+                # Converted on their own, so whole numbers stay integers next to the text cells
+                cells = df[column].astype(object)
+                cells[parsed] = pd.to_numeric(cells[parsed]).astype(object)
+                df[column] = cells
         
         print(f"[*] Created DataFrame with shape: {df.shape}")
         return [df]
 
-    def _find_headers(self, texts: List[str], header_patterns: Dict[str, List[str]]) -> Dict[str, int]:
-        """Find the positions of table headers in the text list"""
+    def _find_headers(self, texts: List[str], header_patterns: Dict[str, List[str]],
+                      automaton=None) -> Dict[str, int]:
+        """
+        Find the positions of table headers in the text list.
+        
+        With a prebuilt automaton each text is scanned once for all keywords;
+        otherwise every pattern is checked with a substring test.
+        """
         header_indices = {}
         
         for i, text in enumerate(texts):
             text_lower = text.lower()
             
-            for column_name, patterns in header_patterns.items():
-                if column_name not in header_indices:  # Only find first occurrence
-                    for pattern in patterns:
-                        if pattern in text_lower:
-                            header_indices[column_name] = i
-                            break
+            if automaton is not None:
+                matched = {column_name
+                           for _, columns in automaton.iter(text_lower)
+                           for column_name in columns}
+            else:
+                matched = {column_name
+                           for column_name, patterns in header_patterns.items()
+                           if any(pattern in text_lower for pattern in patterns)}
+            
+            for column_name in header_patterns:
+                if column_name in matched:
+                    header_indices.setdefault(column_name, i)  # Only keep first occurrence
+            
+            if len(header_indices) == len(header_patterns):
+                break
         
         return header_indices
 
-    def _is_unit_indicator(self, text: str) -> bool:
+    @staticmethod
+    def _is_unit_indicator(text: str) -> bool:
         """Check if text is a unit indicator like (mm), (cm), etc."""
-        return bool(re.match(r'^\([a-zA-Z]+\)$', text.strip()))
+        s = text.strip()
+        inner = s[1:-1]
+        return len(s) >= 3 and s[0] == '(' and s[-1] == ')' and inner.isascii() and inner.isalpha()
 
     def _parse_data_rows(self, data_texts: List[str]) -> List[List[str]]:
         """
@@ -133,106 +249,62 @@ class DataMapper:
         Part Number, Machine Number, Diameter, Length, Tolerance, Quantity
         """
         rows = []
-        current_row = []
-        
-        # Patterns to identify different types of data
-        part_number_pattern = r'^PN-[A-Z0-9-]+$'
-        machine_number_pattern = r'^M-\d+$'
-        number_pattern = r'^\d+\.?\d*$'
-        tolerance_pattern = r'^[±+]\d+\.\d+$|^t\d+\.\d+$'
         
         # Clean and preprocess the data
         cleaned_texts = []
         for text in data_texts:
             text = text.strip()
-            if not text or 'file://' in text or text in ['II', 'Log']:
+            if not text or text in _SKIP_TOKENS or any(sub in text for sub in _SKIP_SUBSTRINGS):
                 continue
             
             # Fix common OCR errors upfront
-            if text == 'ISO':
-                text = '150'
-            elif text == 'Soo':
-                text = '500'
-            elif 'IS.' in text:
-                text = text.replace('IS.', '15.')
-            elif '$' in text:
-                text = text.replace('$', '.5')
-            elif 'o' in text and text != 'Log' and not re.match(part_number_pattern, text, re.IGNORECASE):
-                text = text.replace('o', '0')
-            elif '..' in text:
-                text = text.replace('..', '.')
-            
-            cleaned_texts.append(text)
+            cleaned_texts.append(self._correct_token(text))
         
         print(f"[DEBUG] Cleaned texts: {cleaned_texts}")
         
         # Group texts into rows of 6 elements each
         # Based on the pattern: PN-xxx, M-xx, diameter, length, tolerance, quantity
-        i = 0
-        while i < len(cleaned_texts):
-            text = cleaned_texts[i]
-            
-            # Start new row if we find a part number
-            if re.match(part_number_pattern, text, re.IGNORECASE):
-                if current_row and len(current_row) >= 4:
-                    rows.append(self._pad_row(current_row, 6))
-                
-                # Start new row and try to collect 6 consecutive elements
-                current_row = [text]
-                
-                # Look ahead for the next 5 elements
-                for j in range(1, 6):
-                    if i + j < len(cleaned_texts):
-                        next_text = cleaned_texts[i + j]
-                        current_row.append(next_text)
-                    else:
-                        current_row.append('')  # Fill missing with empty
-                
-                # Skip the elements we just processed
-                i += min(6, len(cleaned_texts) - i)
-            else:
-                i += 1
-        
-        # Add the last row if it exists
-        if current_row and len(current_row) >= 4:
-            rows.append(self._pad_row(current_row, 6))
+        tags = [_classify_token(text) for text in cleaned_texts]
+        for start in _group_row_starts(tags, ROW_LENGTH):
+            rows.append(self._pad_row(cleaned_texts[start:start + ROW_LENGTH], ROW_LENGTH))
         
         print(f"[DEBUG] Parsed rows: {rows}")
         return rows
 
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _correct_token(text: str) -> str:
+        """
+        Fix common OCR errors in a single stripped token.
+        
+        Tokens repeat heavily within and across pages, so results are cached
+        for the life of the process.
+        """
+        if text == 'ISO':
+            return '150'
+        elif text == 'Soo':
+            return '500'
+        elif 'IS.' in text:
+            return text.replace('IS.', '15.')
+        elif '$' in text:
+            return text.translate(_DOLLAR_FIX)
+        elif 'o' in text and not PART_NUMBER_RE.match(text):
+            return text.translate(_LETTER_O_FIX)
+        elif '..' in text:
+            return text.replace('..', '.')
+        return text
+
     def _pad_row(self, row: List[str], target_length: int) -> List[str]:
         """Pad row to target length with empty strings"""
-        while len(row) < target_length:
-            row.append('')
-        return row[:target_length]  # Trim if too long
+        # A negative repeat count yields [], so this also trims rows that are too long
+        return (row + [''] * (target_length - len(row)))[:target_length]
 
     def _clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean up the DataFrame by fixing common OCR errors and formatting"""
-        
-        # Clean up Part Numbers
-        df['Part Number'] = df['Part Number'].str.replace('PN-SSI-C', 'PN-551-C', regex=False)
-        df['Part Number'] = df['Part Number'].str.replace('PN-I2-D', 'PN-12-D', regex=False)
-        
-        # Clean up Machine Numbers
-        df['Machine Number'] = df['Machine Number'].str.replace('M-0S', 'M-05', regex=False)
-        
-        # Clean up numeric columns
-        for col in ['Diameter (mm)', 'Length (cm)']:
+        for col, (pattern, fixups) in _COLUMN_FIXUP_PATTERNS.items():
             if col in df.columns:
-                df[col] = df[col].str.replace('$', '.5', regex=False)
-                df[col] = df[col].str.replace('IS.', '15.', regex=False)
-        
-        # Clean up Tolerance column
-        if 'Tolerance (mm)' in df.columns:
-            df['Tolerance (mm)'] = df['Tolerance (mm)'].str.replace('t0.0S', '±0.05', regex=False)
-            df['Tolerance (mm)'] = df['Tolerance (mm)'].str.replace('t0.', '±0.', regex=False)
-            df['Tolerance (mm)'] = df['Tolerance (mm)'].str.replace('t', '±', regex=False)
-        
-        # Clean up Quantity column
-        if 'Quantity' in df.columns:
-            df['Quantity'] = df['Quantity'].str.replace('o', '0', regex=False)
-            df['Quantity'] = df['Quantity'].str.replace('Soo', '500', regex=False)
-            df['Quantity'] = df['Quantity'].str.replace('ISO', '150', regex=False)
+                # One pass per column; the alternation tries fixups in declared order
+                df[col] = df[col].str.replace(pattern, lambda m, f=fixups: f[m.group(0)], regex=True)
         
         return df
 
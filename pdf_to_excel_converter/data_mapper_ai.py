@@ -9,12 +9,224 @@ import re
 import numpy as np
 from typing import List, Dict, Any, Tuple, Optional
 from collections import Counter, defaultdict
-import difflib
-from sklearn.cluster import DBSCAN
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from text_results import TextResults
+
+try:
+    # Optional: C kd-tree for the neighbor search and optimal column assignment
+    from scipy.optimize import linear_sum_assignment
+    from scipy.spatial import cKDTree
+except ImportError:
+    linear_sum_assignment = cKDTree = None
+
+# Common header keyword families; a text scores one point per family it mentions
+_HEADER_KEYWORD_FAMILIES = (
+    ('number', 'no', 'id', 'code'),
+    ('name', 'description', 'item', 'product'),
+    ('quantity', 'qty', 'amount', 'count'),
+    ('price', 'cost', 'rate', 'value'),
+    ('date', 'time', 'when'),
+    ('size', 'dimension', 'length', 'width', 'height', 'diameter'),
+    ('tolerance', 'precision', 'accuracy'),
+    ('machine', 'equipment', 'device'),
+    ('part', 'component', 'element'),
+    ('total', 'sum', 'subtotal'),
+)
+# Keyword -> family index. A keyword matches as a whole word (like \bkeyword\b)
+# exactly when it equals one of the text's maximal \w+ runs, so one tokenizing
+# pass plus dict lookups replaces a regex search per family.
+_HEADER_KEYWORD_INDEX = {
+    keyword: family
+    for family, keywords in enumerate(_HEADER_KEYWORD_FAMILIES)
+    for keyword in keywords
+}
+_WORD_RE = re.compile(r'\w+')
+
+# Value-shape patterns used for header scoring and column type detection
+_UNIT_RE = re.compile(r'\([a-zA-Z]+\)')
+_CODE_RE = re.compile(r'^[A-Z0-9-]+$')
+_NUMBER_RE = re.compile(r'^\d+\.?\d*$')
+
+# Column type of a stripped sample value in one match. Each alternative stands in
+# for one of the checks _detect_column_type used to run in turn, in the same order;
+# they are mutually exclusive and the matching group's name is the type
+# - tolerance: the old _TOLERANCE_RE, e.g. '±0.05' or 't0.05'
+_TOLERANCE_PATTERN = r'[±+]\d+\.\d+|t\d+\.\d+'
+# - code: _CODE_RE plus the separate "contains a letter" scan, as a lookahead
+_CODE_PATTERN = r'(?=[0-9-]*[A-Z])[A-Z0-9-]+'
+# - numeric: _NUMBER_RE (digits, optional '.', digits) on the value with its commas
+#   removed, so commas may appear anywhere; that '$' also let one trailing newline
+#   through, which may be followed by the commas that were stripped
+_NUMERIC_PATTERN = r',*\d[\d,]*(?:\.[\d,]*)?(?:\n,*)?'
+_COLUMN_TYPE_RE = re.compile(
+    rf'(?P<tolerance>{_TOLERANCE_PATTERN})$'
+    rf'|(?P<code>{_CODE_PATTERN})$'
+    rf'|(?P<numeric>{_NUMERIC_PATTERN})$'
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# OCR fragments that are never table content
+_NOISE_LITERALS = frozenset({'II', 'Log', 'NaN'})
+
+def _is_noise_text(text: str) -> bool:
+    """True for file paths, known junk tokens and short non-alphanumeric fragments"""
+    return 'file://' in text or text in _NOISE_LITERALS or (len(text) <= 2 and not text.isalnum())
+
+# Rows dropped as repeated headers or unit lines during cleaning
+_UNIT_ROW_RE = re.compile(r'\(mm\)|\(cm\)|\(in\)|number')
+_HEADER_WORDS = ('number', 'part', 'machine', 'diameter', 'length', 'tolerance', 'quantity')
+
+# Common OCR errors in numbers, fixed in one translate pass ('..' -> '.' is
+# not a single-character fix and is applied afterwards)
+_NUMERIC_OCR_FIX = str.maketrans({
+    'O': '0', 'o': '0', 'I': '1', 'l': '1', 'S': '5', 's': '5',
+    'G': '6', 'B': '8', 'g': '9', '$': '.5'
+})
+
+def _grid_neighbor_pairs(positions: np.ndarray, eps: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find all pairs of points at most eps apart using a uniform grid of eps-sized cells.
+    
+    Each point only needs to be compared with points in its own and the 8
+    surrounding cells. Returns index arrays (i, j) with i < j for every pair.
+    """
+    cells = np.floor(positions / eps).astype(np.int64)
+    buckets = defaultdict(list)
+    for idx, cell in enumerate(map(tuple, cells.tolist())):
+        buckets[cell].append(idx)
+    buckets = {cell: np.asarray(members) for cell, members in buckets.items()}
+    
+    eps_sq = eps * eps
+    pairs_i, pairs_j = [], []
+    for (cx, cy), members in buckets.items():
+        member_pos = positions[members]
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                others = buckets.get((cx + dx, cy + dy))
+                if others is None:
+                    continue
+                diff = member_pos[:, None, :] - positions[others][None, :, :]
+                a, b = np.nonzero((diff * diff).sum(axis=2) <= eps_sq)
+                a, b = members[a], others[b]
+                keep = a < b  # Each pair is seen from both cells; keep one orientation
+                pairs_i.append(a[keep])
+                pairs_j.append(b[keep])
+    
+    if not pairs_i:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+def _neighbor_pairs(positions: np.ndarray, eps: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Find all pairs of points at most eps apart, preferring scipy's kd-tree when available"""
+    # Distances are computed in float64 whatever the storage type (int16 would overflow)
+    positions = np.asarray(positions, dtype=np.float64)
+    if cKDTree is None:
+        return _grid_neighbor_pairs(positions, eps)
+    pairs = cKDTree(positions).query_pairs(r=eps, output_type='ndarray')
+    return pairs[:, 0].astype(np.int64), pairs[:, 1].astype(np.int64)
+
+def _dbscan_labels(n_points: int, pairs: Tuple[np.ndarray, np.ndarray], min_samples: int) -> np.ndarray:
+    """
+    DBSCAN cluster labels from precomputed eps-neighbor pairs (-1 marks noise).
+    
+    Matches sklearn's DBSCAN: a point is core when its neighborhood, itself
+    included, has at least min_samples points; connected core points form a
+    cluster, numbered in order of their lowest point index; and a border point
+    joins the earliest-numbered cluster it touches.
+    """
+    pairs_i, pairs_j = pairs
+    degree = np.bincount(pairs_i, minlength=n_points) + np.bincount(pairs_j, minlength=n_points) + 1
+    is_core = degree >= min_samples
+    
+    # Union-find over core-core edges
+    parent = list(range(n_points))
+    
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+    
+    core_edges = is_core[pairs_i] & is_core[pairs_j]
+    for a, b in zip(pairs_i[core_edges].tolist(), pairs_j[core_edges].tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+    
+    labels = np.full(n_points, -1, dtype=np.int64)
+    root_labels = {}
+    for point in np.flatnonzero(is_core).tolist():
+        root = find(point)
+        if root not in root_labels:
+            root_labels[root] = len(root_labels)
+        labels[point] = root_labels[root]
+    
+    # Border points take the lowest label among their core neighbors
+    for border, core in ((pairs_i, pairs_j), (pairs_j, pairs_i)):
+        mask = ~is_core[border] & is_core[core]
+        for point, label in zip(border[mask].tolist(), labels[core[mask]].tolist()):
+            if labels[point] == -1 or label < labels[point]:
+                labels[point] = label
+    
+    return labels
+
+def _assign_columns(distances: np.ndarray, max_distance: float) -> np.ndarray:
+    """
+    Assign row elements to header columns from an (elements x headers) distance matrix.
+    
+    Only pairs closer than max_distance may be matched and each column takes at
+    most one element. With scipy the assignment maximizes the number of matches,
+    then minimizes their total distance; otherwise each element greedily takes
+    its nearest column if still free. Returns the column per element, -1 if none.
+    """
+    n_elements, n_columns = distances.shape
+    assignment = np.full(n_elements, -1, dtype=np.int64)
+    close = distances < max_distance
+    
+    if linear_sum_assignment is not None:
+        # A large finite cost (not inf) keeps the problem feasible; those pairs are dropped below
+        far_cost = distances.max(initial=0.0) * (n_elements + n_columns) + max_distance + 1.0
+        elem_idx, col_idx = linear_sum_assignment(np.where(close, distances, far_cost))
+        keep = close[elem_idx, col_idx]
+        assignment[elem_idx[keep]] = col_idx[keep]
+        return assignment
+    
+    used_columns = set()
+    nearest = distances.argmin(axis=1).tolist() if n_columns else [0] * n_elements
+    for i, col in enumerate(nearest):
+        if n_columns and close[i, col] and col not in used_columns:
+            assignment[i] = col
+            used_columns.add(col)
+    return assignment
+
+class TextElements:
+    """
+    OCR text elements stored as parallel arrays (struct-of-arrays).
+    
+    Element i is (texts[i], xs[i], ys[i], confidences[i], bboxes[i]). The
+    pipeline stages pass integer index arrays into these instead of copying
+    per-element dicts, so position math runs over contiguous float arrays.
+    """
+    __slots__ = ('texts', 'xs', 'ys', 'confidences', 'bboxes')
+    
+    def __init__(self, texts: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+                 confidences: np.ndarray, bboxes: List):
+        self.texts = texts
+        self.xs = xs
+        self.ys = ys
+        self.confidences = confidences
+        self.bboxes = bboxes
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+
+# Vertical distance (pixels) separating table rows, and data rows from the header
+ROW_TOLERANCE = 30
 
 class AIDataMapper:
+    __slots__ = ('confidence_threshold', 'min_table_rows', 'max_columns')
+    
     def __init__(self):
         self.confidence_threshold = 0.3
         self.min_table_rows = 2
@@ -55,9 +267,7 @@ class AIDataMapper:
         
         # Step 2: For each table region, detect structure
         all_dataframes = []
-        for i, region in enumerate(table_regions):
-            print(f"[*] Processing table region {i+1}/{len(table_regions)}")
-            df = self._process_table_region(region)
+        for df in self._process_table_regions(text_elements, table_regions):
             if df is not None and not df.empty:
                 all_dataframes.append(df)
         
@@ -67,100 +277,149 @@ class AIDataMapper:
         
         return all_dataframes
 
-    def _extract_text_elements(self, text_results: List[Dict]) -> List[Dict]:
+    def _extract_text_elements(self, text_results: List[Dict]) -> TextElements:
         """Extract text elements with position and confidence information"""
-        elements = []
-        
-        for result in text_results:
-            text = result.get('text', '').strip()
-            if not text:
-                continue
-                
-            bbox = result.get('bbox', [])
-            confidence = result.get('confidence', 1.0)
-            
-            # Calculate center position for clustering
-            if bbox and len(bbox) >= 4:
-                # Handle different bbox formats
-                if isinstance(bbox[0], list):  # [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                    x_coords = [point[0] for point in bbox]
-                    y_coords = [point[1] for point in bbox]
-                else:  # [x1, y1, x2, y2] or similar
-                    x_coords = [bbox[0], bbox[2]] if len(bbox) >= 4 else [0, 0]
-                    y_coords = [bbox[1], bbox[3]] if len(bbox) >= 4 else [0, 0]
-                
-                center_x = sum(x_coords) / len(x_coords)
-                center_y = sum(y_coords) / len(y_coords)
-            else:
-                center_x, center_y = 0, 0
-            
-            elements.append({
-                'text': text,
-                'x': center_x,
-                'y': center_y,
-                'confidence': confidence,
-                'bbox': bbox
-            })
+        if isinstance(text_results, TextResults):
+            # Boxes and confidences are already arrays; only the texts are checked one by one
+            stripped = [text.strip() for text in text_results.text]
+            keep = [i for i, text in enumerate(stripped) if text and not _is_noise_text(text)]
+            texts = [stripped[i] for i in keep]
+            bboxes = text_results.bbox[keep]
+            confidences = text_results.confidence[keep]
+        else:
+            texts, bboxes, confidences = [], [], []
+            for result in text_results:
+                text = result.get('text', '').strip()
+                # Skip empty text and noise (file paths, stray characters) up front
+                # so no later stage has to look at it
+                if not text or _is_noise_text(text):
+                    continue
+                texts.append(text)
+                bboxes.append(result.get('bbox', []))
+                confidences.append(result.get('confidence', 1.0))
+        
+        if not texts:
+            empty = np.empty(0, dtype=np.float64)
+            return TextElements(np.empty(0, dtype=object), empty, empty, empty, [])
+        
+        # Calculate center positions for clustering in one vectorized pass
+        if isinstance(bboxes, np.ndarray):
+            centers = bboxes.mean(axis=1)
+        else:
+            centers = self._bbox_centers(bboxes)
         
         # Sort by y-coordinate (top to bottom), then x-coordinate (left to right)
-        elements.sort(key=lambda e: (e['y'], e['x']))
-        
-        return elements
+        order = np.lexsort((centers[:, 0], centers[:, 1]))
+        text_array = np.empty(len(texts), dtype=object)
+        text_array[:] = texts
+        
+        return TextElements(
+            texts=text_array[order],
+            xs=centers[order, 0],
+            ys=centers[order, 1],
+            confidences=np.asarray(confidences, dtype=np.float64)[order],
+            bboxes=[bboxes[i] for i in order.tolist()]
+        )
 
-    def _detect_table_regions(self, text_elements: List[Dict]) -> List[List[Dict]]:
-        """Use spatial clustering to detect potential table regions"""
-        if len(text_elements) < 5:
-            return [text_elements]
-        
-        # Extract positions for clustering
-        positions = np.array([[elem['x'], elem['y']] for elem in text_elements])
-        
-        # Use DBSCAN clustering to group spatially close elements
-        clustering = DBSCAN(eps=50, min_samples=3).fit(positions)
-        labels = clustering.labels_
-        
-        # Group elements by cluster
-        clusters = defaultdict(list)
-        for i, label in enumerate(labels):
-            if label != -1:  # -1 is noise in DBSCAN
-                clusters[label].append(text_elements[i])
-        
-        # Filter clusters that might be tables (have enough elements)
+    @staticmethod
+    def _bbox_centers(bboxes: List) -> np.ndarray:
+        """Return an (N, 2) array with the center of each bbox (0, 0 when missing)"""
+        # Fast path: every bbox is a [[x1,y1], [x2,y2], [x3,y3], [x4,y4]] polygon
+        if all(len(bbox) == 4 and isinstance(bbox[0], list) for bbox in bboxes):
+            try:
+                return np.asarray(bboxes, dtype=np.float64).reshape(len(bboxes), 4, 2).mean(axis=1)
+            except ValueError:
+                pass  # Ragged points; handle each bbox below
+        
+        centers = np.zeros((len(bboxes), 2), dtype=np.float64)
+        for i, bbox in enumerate(bboxes):
+            if not bbox or len(bbox) < 4:
+                continue
+            # Handle different bbox formats
+            if isinstance(bbox[0], list):  # [[x1,y1], [x2,y2], ...] polygon
+                centers[i] = np.asarray(bbox, dtype=np.float64).reshape(-1, 2).mean(axis=0)
+            else:  # [x1, y1, x2, y2] or similar
+                centers[i] = ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+        return centers
+
+    def _detect_table_regions(self, elements: TextElements) -> List[np.ndarray]:
+        """Use spatial clustering to detect potential table regions (as element index arrays)"""
+        all_elements = np.arange(len(elements))
+        if len(elements) < 5:
+            return [all_elements]
+        
+        # Extract positions for clustering, quantized to whole pixels; page
+        # coordinates fit in int16, which keeps the clustering input small
+        positions = np.rint(np.column_stack((elements.xs, elements.ys)))
+        if np.abs(positions).max() <= np.iinfo(np.int16).max:
+            positions = positions.astype(np.int16)
+        
+        # DBSCAN-style clustering to group spatially close elements
+        eps = 50
+        labels = _dbscan_labels(len(positions), _neighbor_pairs(positions, eps), min_samples=3)
+        
+        # Group elements by cluster: a stable sort by label followed by a split at
+        # the label boundaries keeps each cluster's indices ascending, i.e. in (y, x) order
+        clustered = np.flatnonzero(labels != -1)  # -1 is noise in DBSCAN
+        clustered_labels = labels[clustered]
+        _, first_seen, counts = np.unique(clustered_labels, return_index=True, return_counts=True)
+        members = clustered[np.argsort(clustered_labels, kind='stable')]
+        clusters = np.split(members, np.cumsum(counts)[:-1])
+        
+        # Filter clusters that might be tables (have enough elements), in order
+        # of each cluster's first element
+        min_elements = self.min_table_rows * 2  # At least 2 rows with some columns
         table_regions = []
-        for cluster_elements in clusters.values():
-            if len(cluster_elements) >= self.min_table_rows * 2:  # At least 2 rows with some columns
-                # Sort elements within cluster
-                cluster_elements.sort(key=lambda e: (e['y'], e['x']))
-                table_regions.append(cluster_elements)
+        for cluster in np.argsort(first_seen).tolist():
+            if counts[cluster] >= min_elements:
+                table_regions.append(clusters[cluster])
         
         # If no good clusters found, treat all elements as one region
         if not table_regions:
-            table_regions = [text_elements]
+            table_regions = [all_elements]
         
         return table_regions
 
-    def _process_table_region(self, elements: List[Dict]) -> Optional[pd.DataFrame]:
+    def _process_table_regions(self, elements: TextElements, table_regions: List[np.ndarray]):
+        """
+        Yield the DataFrame (or None) for each table region, in region order.
+        """
+        n_regions = len(table_regions)
+        for i, region in enumerate(table_regions):
+            print(f"[*] Processing table region {i+1}/{n_regions}")
+            yield self._process_table_region(elements, region)
+
+    def _process_table_region(self, elements: TextElements, region: np.ndarray) -> Optional[pd.DataFrame]:
         """Process a table region to extract structured data"""
-        print(f"    - Processing region with {len(elements)} elements")
+        print(f"    - Processing region with {len(region)} elements")
+        
+        # Cheap necessary conditions before any text analysis: a table needs a
+        # header plus min_table_rows rows of at least two cells, each row at
+        # least ROW_TOLERANCE below the one before (the first below the header)
+        min_rows = self.min_table_rows
+        if (len(region) < max(3, 1 + 2 * min_rows) or
+                np.ptp(elements.ys[region]) <= min_rows * ROW_TOLERANCE):
+            print("    - Region too small for a table")
+            return None
         
         # Step 1: Detect headers using AI techniques
-        headers = self._detect_headers_ai(elements)
+        headers = self._detect_headers_ai(elements, region)
         
-        if not headers:
+        if not len(headers):
             print("    - No headers detected")
             return None
         
-        print(f"    - Detected headers: {[h['text'] for h in headers]}")
+        print(f"    - Detected headers: {elements.texts[headers].tolist()}")
         
         # Step 2: Detect rows and columns structure
-        table_structure = self._detect_table_structure(elements, headers)
+        table_structure = self._detect_table_structure(elements, region, headers)
         
         if not table_structure or len(table_structure) < self.min_table_rows:
             print("    - Insufficient table structure detected")
             return None
         
         # Step 3: Create DataFrame
-        df = self._create_dataframe_from_structure(table_structure, headers)
+        df = self._create_dataframe_from_structure(elements, table_structure, headers)
         
         # Step 4: Clean and validate data
         df = self._clean_dataframe_ai(df)
@@ -168,40 +427,32 @@ class AIDataMapper:
         print(f"    - Created DataFrame with shape: {df.shape}")
         return df
 
-    def _detect_headers_ai(self, elements: List[Dict]) -> List[Dict]:
-        """Use AI techniques to detect table headers"""
-        if len(elements) < 3:
-            return []
+    def _detect_headers_ai(self, elements: TextElements, region: np.ndarray) -> np.ndarray:
+        """Use AI techniques to detect table headers; returns header element indices sorted by x"""
+        if len(region) < 3:
+            return np.empty(0, dtype=np.int64)
+        
+        texts = elements.texts
+        xs, ys = elements.xs, elements.ys
         
         # Strategy 1: Look for elements that appear to be headers based on content
         header_candidates = []
+        header_scores = {}
         
-        for elem in elements:
-            text = elem['text'].lower()
+        for i in region.tolist():
+            raw_text = texts[i]
+            text = raw_text.lower()
             
             # Check if text looks like a header
             header_score = 0
             
-            # Common header patterns
-            header_patterns = [
-                r'\b(number|no|id|code)\b',
-                r'\b(name|description|item|product)\b',
-                r'\b(quantity|qty|amount|count)\b',
-                r'\b(price|cost|rate|value)\b',
-                r'\b(date|time|when)\b',
-                r'\b(size|dimension|length|width|height|diameter)\b',
-                r'\b(tolerance|precision|accuracy)\b',
-                r'\b(machine|equipment|device)\b',
-                r'\b(part|component|element)\b',
-                r'\b(total|sum|subtotal)\b'
-            ]
-            
-            for pattern in header_patterns:
-                if re.search(pattern, text):
-                    header_score += 1
+            # Common header patterns, one point per keyword family present
+            families = {_HEADER_KEYWORD_INDEX[word] for word in _WORD_RE.findall(text)
+                        if word in _HEADER_KEYWORD_INDEX}
+            header_score += len(families)
             
             # Check for units in parentheses
-            if re.search(r'\([a-zA-Z]+\)', text):
+            if _UNIT_RE.search(text):
                 header_score += 0.5
             
             # Prefer shorter texts for headers
@@ -209,139 +460,119 @@ class AIDataMapper:
                 header_score += 0.3
             
             # Check if it's likely a data value (numbers, codes)
-            if re.match(r'^[A-Z0-9-]+$', elem['text']) or re.match(r'^\d+\.?\d*$', elem['text']):
+            if _CODE_RE.match(raw_text) or _NUMBER_RE.match(raw_text):
                 header_score -= 1
             
             if header_score > 0:
-                elem['header_score'] = header_score
-                header_candidates.append(elem)
+                header_scores[i] = header_score
+                header_candidates.append(i)
         
         if not header_candidates:
             # Fallback: use first row as headers
-            first_row_y = elements[0]['y']
+            first_row_y = ys[region[0]]
             tolerance = 20  # pixels
-            first_row = [e for e in elements if abs(e['y'] - first_row_y) < tolerance]
-            return sorted(first_row, key=lambda e: e['x'])
+            first_row = region[np.abs(ys[region] - first_row_y) < tolerance]
+            return first_row[np.argsort(xs[first_row], kind='stable')]
         
         # Strategy 2: Group candidates by y-coordinate to find header row
-        header_candidates.sort(key=lambda e: (-e['header_score'], e['y'], e['x']))
+        header_candidates.sort(key=lambda i: (-header_scores[i], ys[i], xs[i]))
         
         # Find the y-coordinate with the most header candidates
         y_groups = defaultdict(list)
         for candidate in header_candidates:
-            y_rounded = round(candidate['y'] / 20) * 20  # Group by 20-pixel intervals
+            y_rounded = round(ys[candidate] / 20) * 20  # Group by 20-pixel intervals
             y_groups[y_rounded].append(candidate)
         
         # Select the group with highest total score
-        best_group = max(y_groups.values(), key=lambda group: sum(e['header_score'] for e in group))
+        best_group = max(y_groups.values(), key=lambda group: sum(header_scores[i] for i in group))
+        best_group = np.asarray(best_group, dtype=np.int64)
         
-        return sorted(best_group, key=lambda e: e['x'])
+        return best_group[np.argsort(xs[best_group], kind='stable')]
 
-    def _detect_table_structure(self, elements: List[Dict], headers: List[Dict]) -> List[List[Dict]]:
-        """Detect table structure (rows and columns) using AI"""
-        if not headers:
+    def _detect_table_structure(self, elements: TextElements, region: np.ndarray,
+                                headers: np.ndarray) -> List[np.ndarray]:
+        """
+        Detect table structure (rows and columns) using AI.
+        
+        Returns one array per row holding the element index for each header
+        column, or -1 where the column is empty.
+        """
+        if not len(headers):
             return []
         
+        xs, ys = elements.xs, elements.ys
+        
         # Get header y-coordinate
-        header_y = headers[0]['y']
-        tolerance = 30  # pixels
+        header_y = ys[headers[0]]
+        tolerance = ROW_TOLERANCE
         
         # Filter out header elements and elements above headers
-        data_elements = [e for e in elements if e['y'] > header_y + tolerance]
+        data_elements = region[ys[region] > header_y + tolerance]
         
-        if not data_elements:
+        if not len(data_elements):
             return []
         
-        # Filter out obvious non-data elements
-        filtered_elements = []
-        for elem in data_elements:
-            text = elem['text'].strip()
-            # Skip file paths, single characters that are likely noise, etc.
-            if ('file://' in text or 
-                text in ['II', 'Log', 'NaN'] or 
-                (len(text) <= 2 and not text.isalnum())):
-                continue
-            filtered_elements.append(elem)
-        
-        data_elements = filtered_elements
+        # Group elements into rows based on y-coordinate: each row is anchored at
+        # its topmost element and takes everything less than `tolerance` below it
+        data_xs = xs[data_elements]
+        order = np.lexsort((data_xs, ys[data_elements]))
+        sorted_ys = ys[data_elements[order]]
         
-        # Group elements into rows based on y-coordinate with improved clustering
         rows = []
-        current_row = []
-        current_y = None
-        
-        for elem in sorted(data_elements, key=lambda e: (e['y'], e['x'])):
-            if current_y is None:
-                current_y = elem['y']
-                current_row = [elem]
-            elif abs(elem['y'] - current_y) < tolerance:
-                current_row.append(elem)
-            else:
-                if current_row and len(current_row) >= 2:  # Only keep rows with multiple elements
-                    rows.append(sorted(current_row, key=lambda e: e['x']))
-                current_row = [elem]
-                current_y = elem['y']
-        
-        # Add the last row
-        if current_row and len(current_row) >= 2:
-            rows.append(sorted(current_row, key=lambda e: e['x']))
+        start = 0
+        while start < len(order):
+            end = int(np.searchsorted(sorted_ys, sorted_ys[start] + tolerance, side='left'))
+            if end - start >= 2:  # Only keep rows with multiple elements
+                members = order[start:end]
+                members = members[np.argsort(data_xs[members], kind='stable')]
+                rows.append(data_elements[members])
+            start = end
         
         # Improved column alignment with headers
         aligned_rows = []
-        header_x_positions = [h['x'] for h in headers]
+        header_x_positions = xs[headers]
         
         for row in rows:
-            aligned_row = [None] * len(headers)
-            used_positions = set()
+            aligned_row = np.full(len(headers), -1, dtype=np.int64)
             
-            # First pass: exact matches and very close matches
-            for elem in row:
-                distances = [abs(elem['x'] - hx) for hx in header_x_positions]
-                min_distance = min(distances)
-                closest_col = distances.index(min_distance)
-                
-                # Only assign if reasonably close and position not used
-                if min_distance < 80 and closest_col not in used_positions:
-                    aligned_row[closest_col] = elem
-                    used_positions.add(closest_col)
+            # First pass: match elements to reasonably close headers
+            distances = np.abs(np.subtract.outer(xs[row], header_x_positions))
+            assignment = _assign_columns(distances, max_distance=80)
+            matched = assignment != -1
+            aligned_row[assignment[matched]] = row[matched]
             
             # Second pass: assign remaining elements to empty columns
-            unassigned_elements = [elem for elem in row if elem not in aligned_row]
-            empty_columns = [i for i, cell in enumerate(aligned_row) if cell is None]
-            
-            for elem, col_idx in zip(unassigned_elements, empty_columns):
-                aligned_row[col_idx] = elem
+            unassigned_elements = row[~matched]
+            empty_columns = np.flatnonzero(aligned_row == -1)
+            n_fill = min(len(unassigned_elements), len(empty_columns))
+            aligned_row[empty_columns[:n_fill]] = unassigned_elements[:n_fill]
             
             # Only keep rows with at least half the columns filled
-            filled_columns = sum(1 for cell in aligned_row if cell is not None)
+            filled_columns = int(np.count_nonzero(aligned_row != -1))
             if filled_columns >= len(headers) // 2:
                 aligned_rows.append(aligned_row)
         
         return aligned_rows
 
-    def _create_dataframe_from_structure(self, table_structure: List[List[Dict]], headers: List[Dict]) -> pd.DataFrame:
+    def _create_dataframe_from_structure(self, elements: TextElements, table_structure: List[np.ndarray],
+                                         headers: np.ndarray) -> pd.DataFrame:
         """Create DataFrame from detected table structure"""
         # Create column names
         column_names = []
-        for header in headers:
-            col_name = header['text'].strip()
+        for header in elements.texts[headers].tolist():
+            col_name = header.strip()
             # Clean up column name
-            col_name = re.sub(r'\s+', ' ', col_name)
+            col_name = _WHITESPACE_RE.sub(' ', col_name)
             column_names.append(col_name)
         
-        # Create data rows
-        data_rows = []
-        for row in table_structure:
-            data_row = []
-            for cell in row:
-                if cell is not None:
-                    data_row.append(cell['text'].strip())
-                else:
-                    data_row.append('')
-            data_rows.append(data_row)
+        # Create data rows in one gather: texts are already stripped at extraction,
+        # and an extra trailing '' makes the -1 (empty cell) index pick an empty string
+        cell_texts = np.append(elements.texts, '')
+        cell_indices = np.array(table_structure, dtype=np.int64).reshape(len(table_structure), len(headers))
+        data = cell_texts[cell_indices]
         
-        # Create DataFrame
-        df = pd.DataFrame(data_rows, columns=column_names)
+        # Create DataFrame straight from the object array
+        df = pd.DataFrame(data, columns=column_names, copy=False)
         
         return df
 
@@ -354,17 +585,15 @@ class AIDataMapper:
         df = df.dropna(how='all')
         df = df[~(df == '').all(axis=1)]
         
-        # Remove rows that are likely header repetitions or units
-        rows_to_remove = []
-        for idx, row in df.iterrows():
-            row_text = ' '.join(str(val) for val in row.values if pd.notna(val) and str(val).strip())
-            
-            # Check if row contains only units or header-like text
-            if (any(unit in row_text.lower() for unit in ['(mm)', '(cm)', '(in)', 'number']) or
-                row_text.lower().strip() in ['number', 'part', 'machine', 'diameter', 'length', 'tolerance', 'quantity']):
-                rows_to_remove.append(idx)
-        
-        df = df.drop(rows_to_remove)
+        # Remove rows that are likely header repetitions or units: a unit (or
+        # 'number') anywhere in the row, or a header word as the row's only value
+        if not df.empty:
+            cells = df.fillna('').astype(str)
+            lowered = cells.apply(lambda col: col.str.lower())
+            filled_cells = cells.apply(lambda col: col.str.strip() != '').sum(axis=1)
+            has_unit = lowered.apply(lambda col: col.str.contains(_UNIT_ROW_RE)).any(axis=1)
+            is_header_word = lowered.apply(lambda col: col.str.strip().isin(_HEADER_WORDS)).any(axis=1)
+            df = df[~(has_unit | ((filled_cells == 1) & is_header_word))]
         df = df.reset_index(drop=True)
         
         # Auto-detect and clean data types for each column
@@ -400,23 +629,13 @@ class AIDataMapper:
         """Detect the type of data in a column"""
         sample_values = series.head(10).tolist()
         
-        # Check for numeric values
-        numeric_count = 0
-        code_count = 0
-        tolerance_count = 0
-        
-        for value in sample_values:
-            value_str = str(value).strip()
-            
-            # Check for tolerance patterns
-            if re.match(r'^[±+]\d+\.\d+$|^t\d+\.\d+$', value_str):
-                tolerance_count += 1
-            # Check for code patterns (letters and numbers with dashes)
-            elif re.match(r'^[A-Z0-9-]+$', value_str) and any(c.isalpha() for c in value_str):
-                code_count += 1
-            # Check for numeric patterns
-            elif re.match(r'^\d+\.?\d*$', value_str.replace(',', '')):
-                numeric_count += 1
+        # Vote on the type of each sample value
+        counts = Counter(
+            match.lastgroup
+            for match in map(_COLUMN_TYPE_RE.match, (str(value).strip() for value in sample_values))
+            if match
+        )
+        tolerance_count, code_count, numeric_count = counts['tolerance'], counts['code'], counts['numeric']
         
         total = len(sample_values)
         if tolerance_count / total > 0.5:
@@ -430,96 +649,42 @@ class AIDataMapper:
 
     def _clean_numeric_column(self, series: pd.Series) -> pd.Series:
         """Clean numeric column with OCR error correction"""
-        def clean_numeric(value):
-            if pd.isna(value) or value == '':
-                return value
-            
-            value_str = str(value).strip()
-            
-            # Common OCR errors in numbers
-            corrections = {
-                'O': '0', 'o': '0', 'I': '1', 'l': '1', 'S': '5', 's': '5',
-                'G': '6', 'B': '8', 'g': '9', '$': '.5', '..': '.'
-            }
-            
-            for error, correction in corrections.items():
-                value_str = value_str.replace(error, correction)
-            
-            # Handle special cases
-            if value_str == 'ISO':
-                return '150'
-            elif value_str == 'Soo':
-                return '500'
-            
-            return value_str
-        
-        return series.apply(clean_numeric)
+        # Common OCR errors in numbers; the translate already turns 'ISO' into
+        # '150' and 'Soo' into '500'
+        return (series.str.strip()
+                .str.translate(_NUMERIC_OCR_FIX)
+                .str.replace('..', '.', regex=False))
 
     def _clean_code_column(self, series: pd.Series) -> pd.Series:
         """Clean code/ID column with OCR error correction"""
-        def clean_code(value):
-            if pd.isna(value) or value == '':
-                return value
-            
-            value_str = str(value).strip()
-            
-            # Common OCR errors in codes
-            corrections = {
-                'SSI': '551',  # Common OCR error
-                'I2': '12',    # I mistaken for 1
-                '0S': '05',    # 0 and S confusion
-            }
-            
-            for error, correction in corrections.items():
-                value_str = value_str.replace(error, correction)
-            
-            return value_str
-        
-        return series.apply(clean_code)
+        # Common OCR errors in codes, applied in order
+        return (series.str.strip()
+                .str.replace('SSI', '551', regex=False)  # Common OCR error
+                .str.replace('I2', '12', regex=False)    # I mistaken for 1
+                .str.replace('0S', '05', regex=False))   # 0 and S confusion
 
     def _clean_tolerance_column(self, series: pd.Series) -> pd.Series:
         """Clean tolerance column with proper formatting"""
-        def clean_tolerance(value):
-            if pd.isna(value) or value == '':
-                return value
-            
-            value_str = str(value).strip()
-            
-            # Convert 't' prefix to '±'
-            if value_str.startswith('t'):
-                value_str = '±' + value_str[1:]
-            
-            # Fix common OCR errors
-            value_str = value_str.replace('0S', '05')
-            
-            return value_str
-        
-        return series.apply(clean_tolerance)
+        # Convert 't' prefix to '±', then fix common OCR errors
+        return (series.str.strip()
+                .str.replace(r'^t', '±', regex=True)
+                .str.replace('0S', '05', regex=False))
 
     def _clean_text_column(self, series: pd.Series) -> pd.Series:
         """Clean text column"""
-        def clean_text(value):
-            if pd.isna(value) or value == '':
-                return value
-            
-            # Basic text cleaning
-            return str(value).strip()
-        
-        return series.apply(clean_text)
+        # Basic text cleaning
+        return series.str.strip()
 
-    def _create_fallback_table(self, text_elements: List[Dict]) -> List[pd.DataFrame]:
+    def _create_fallback_table(self, elements: TextElements) -> List[pd.DataFrame]:
         """Create a fallback table when structure detection fails"""
-        if not text_elements:
+        if not len(elements):
             return []
         
-        texts = [elem['text'] for elem in text_elements]
-        confidences = [elem.get('confidence', 1.0) for elem in text_elements]
-        
         df = pd.DataFrame({
-            'Extracted_Text': texts,
-            'Confidence': confidences,
-            'Position_X': [elem['x'] for elem in text_elements],
-            'Position_Y': [elem['y'] for elem in text_elements]
+            'Extracted_Text': elements.texts.tolist(),
+            'Confidence': elements.confidences,
+            'Position_X': elements.xs,
+            'Position_Y': elements.ys
         })
         
         return [df]
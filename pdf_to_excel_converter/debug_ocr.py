@@ -3,7 +3,6 @@
 Debug script to see all extracted OCR text with positions
 """
 
-import pandas as pd
 import os
 
 def debug_ocr_results():
@@ -14,6 +13,9 @@ def debug_ocr_results():
             print(f"Excel file not found: {excel_path}")
             return
         
+        # Imported only once there is a file to read
+        import pandas as pd
+
         df = pd.read_excel(excel_path)
         print(f"Total extracted text elements: {len(df)}")
         print("\nAll extracted text:")
@@ -3,8 +3,36 @@ import os
 import pandas as pd
 from typing import List
 
+try:
+    # Optional: streams rows to disk instead of holding the whole workbook in memory
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
 from config import OUTPUT_DIR
 
+def _write_sheets_streaming(dataframes: List[pd.DataFrame], output_path: str):
+    """
+    Writes each DataFrame to its own sheet with xlsxwriter in constant_memory mode.
+
+    constant_memory flushes every row to disk as soon as the next row starts, so
+    cells must be written row by row. pandas' to_excel writes column by column
+    (which would drop most cells in this mode), so the rows are written here directly.
+    """
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+    try:
+        # Same look as the header row pandas writes
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        for i, df in enumerate(dataframes):
+            worksheet = workbook.add_worksheet(f"Table_Page_{i+1}")
+            worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+            # Missing values become None, which leaves the cell empty like pandas does
+            values = df.astype(object).where(df.notna(), None)
+            for row_idx, row in enumerate(values.itertuples(index=False, name=None), start=1):
+                worksheet.write_row(row_idx, 0, row)
+    finally:
+        workbook.close()
+
 def export_to_excel(dataframes: List[pd.DataFrame], output_filename: str):
     """
     Exports a list of Pandas DataFrames to a single Excel file, with each DataFrame
@@ -23,10 +51,13 @@ def export_to_excel(dataframes: List[pd.DataFrame], output_filename: str):
 
     output_path = os.path.join(OUTPUT_DIR, output_filename)
 
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-        for i, df in enumerate(dataframes):
-            sheet_name = f"Table_Page_{i+1}" # Or come up with a more descriptive name
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    if xlsxwriter is not None:
+        _write_sheets_streaming(dataframes, output_path)
+    else:
+        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            for i, df in enumerate(dataframes):
+                sheet_name = f"Table_Page_{i+1}" # Or come up with a more descriptive name
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
     
     print(f"[*] Successfully exported {len(dataframes)} tables to '{output_path}'")
 
@@ -2,19 +2,26 @@
 import os
 import gc
 import sys
-import shutil
+import queue
 import argparse
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
-from pdf_processor import process_pdf
-from ocr_processor import OCRProcessor
+from pdf_processor import count_pdf_pages, iter_pdf_pages, render_page, scanned_pages
+from ocr_processor import get_ocr_processor
 from data_mapper import DataMapper
+from progress import PageProgress
 from excel_exporter import export_to_excel
-from config import TEMP_IMAGE_DIR, OUTPUT_DIR
+from ocr_cache import page_digest, load_page_results, save_page_results
+from text_results import mean_confidence
+from pipeline import start_stage, PIPELINE_QUEUE_SIZE
+from config import OUTPUT_DIR, OCR_CONFIG, RETRY_DPI
 
-def run_extraction(pdf_path: str, output_excel_filename: str):
+def run_extraction(pdf_path: str, output_excel_filename: str, use_cache: bool = True):
     """
     Main function to run the PDF to Excel conversion process.
+    OCR results are cached per page image unless use_cache is False.
     """
     if not os.path.exists(pdf_path):
         print(f"[ERROR] PDF file not found: {pdf_path}")
@@ -23,58 +30,88 @@ def run_extraction(pdf_path: str, output_excel_filename: str):
     print(f"\n===== Starting PDF to Excel Conversion for '{pdf_path}' =====")
 
     try:
-        # 1. Process PDF to Images
-        print("\n[Step 1/4] Converting PDF to images...")
-        image_paths = process_pdf(pdf_path)
-        if not image_paths:
+        # 1-2. Render the PDF page by page and OCR each page straight from memory
+        print("\n[Step 1-2/4] Converting PDF to images and performing OCR (text and table recognition)...")
+        n_pages = count_pdf_pages(pdf_path)
+        if not n_pages:
             print("[!] No images generated from PDF. Exiting.")
             return False
 
-        # 2. Perform OCR on Images
-        print("\n[Step 2/4] Performing OCR (text and table recognition) on images...")
-        ocr_processor = None
         all_extracted_data = []
         
         try:
-            ocr_processor = OCRProcessor()
+            # Loaded once per process and kept for later conversions; the first load
+            # runs on a helper thread while the first page is being rendered
+            loader = ThreadPoolExecutor(max_workers=1)
+            processor_future = loader.submit(get_ocr_processor)
+            loader.shutdown(wait=False)
             
-            for i, img_path in enumerate(image_paths):
-                print(f"    Processing image {i+1}/{len(image_paths)}: {os.path.basename(img_path)}")
-                
-                try:
-                    text_results, table_results = ocr_processor.process_image(img_path)
-                    all_extracted_data.append({
-                        "image_path": img_path,
-                        "text_results": text_results,
-                        "table_results": table_results
-                    })
-                    
-                    # Force garbage collection after each image to free memory
-                    gc.collect()
+            # Scanned pages are read with the angle classifier (see OCR_CONFIG["use_angle_cls"]);
+            # without PyMuPDF there is no telling, so every page may be a scan
+            scanned = scanned_pages(pdf_path)
+            
+            # Pages are rendered on a pipeline thread while this one runs OCR, so
+            # the OCR models never wait for the next page to be rasterized
+            stop = threading.Event()
+            stage_errors = []
+            image_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+            start_stage("renderer", lambda: iter_pdf_pages(pdf_path, n_pages), image_queue, stop, stage_errors)
+            
+            progress = PageProgress(n_pages)
+            try:
+                for page_number, page in enumerate(iter(image_queue.get, None), start=1):
+                    ocr_processor = processor_future.result()
+                    img_path = page.name
                     
-                except Exception as e:
-                    print(f"    [ERROR] Failed to process {img_path}: {e}")
-                    print(f"    [ERROR] Traceback: {traceback.format_exc()}")
-                    # Continue with other images instead of failing completely
-                    all_extracted_data.append({
-                        "image_path": img_path,
-                        "text_results": [],
-                        "table_results": []
-                    })
-                    continue
+                    try:
+                        # A page read before (same pixels and settings) isn't OCR'd again
+                        use_angle_cls = scanned is None or page_number in scanned
+                        digest = page_digest(page, engine="paddleocr", use_angle_cls=use_angle_cls) if use_cache else None
+                        results = load_page_results(digest) if digest else None
+                        if results is None:
+                            results = ocr_processor.process_image(page, use_angle_cls)
+                            # A poorly read page is read again at RETRY_DPI; the better reading is kept
+                            confidence = mean_confidence(results[0])
+                            threshold = OCR_CONFIG.get("retry_confidence")
+                            if threshold is not None and confidence is not None and confidence < threshold:
+                                print(f"    [*] {img_path}: mean confidence {confidence:.2f}, reading it again at {RETRY_DPI} DPI")
+                                retried = ocr_processor.process_image(render_page(pdf_path, page_number, RETRY_DPI), use_angle_cls)
+                                if (mean_confidence(retried[0]) or 0.0) > confidence:
+                                    results = retried
+                            if digest:
+                                save_page_results(digest, results)
+                        text_results, table_results = results
+                        all_extracted_data.append({
+                            "image_path": img_path,
+                            "text_results": text_results,
+                            "table_results": table_results
+                        })
+                        
+                    except Exception as e:
+                        print(f"    [ERROR] Failed to process {img_path}: {e}")
+                        print(f"    [ERROR] Traceback: {traceback.format_exc()}")
+                        # Continue with other images instead of failing completely
+                        all_extracted_data.append({
+                            "image_path": img_path,
+                            "text_results": [],
+                            "table_results": []
+                        })
+                    progress.update(img_path)
+            finally:
+                progress.close()
+                # Unblock and stop the renderer if OCR ended early
+                stop.set()
+            
+            if stage_errors:
+                name, e = stage_errors[0]
+                print(f"[ERROR] Pipeline stage '{name}' failed: {e}")
+                print(f"[ERROR] Traceback: {''.join(traceback.format_exception(type(e), e, e.__traceback__))}")
+                return False
                     
         except Exception as e:
             print(f"[ERROR] Failed to initialize or run OCR processor: {e}")
             print(f"[ERROR] Traceback: {traceback.format_exc()}")
             return False
-        finally:
-            # Clean up OCR processor
-            if ocr_processor:
-                try:
-                    del ocr_processor
-                    gc.collect()
-                except:
-                    pass
 
         # 3. Map OCR Results to Structured Data
         print("\n[Step 3/4] Mapping OCR results to structured tables...")
@@ -121,14 +158,6 @@ def run_extraction(pdf_path: str, output_excel_filename: str):
         return False
         
     finally:
-        # Clean up temporary images
-        try:
-            if os.path.exists(TEMP_IMAGE_DIR):
-                print(f"[*] Cleaning up temporary images in '{TEMP_IMAGE_DIR}'...")
-                shutil.rmtree(TEMP_IMAGE_DIR)
-        except Exception as e:
-            print(f"[WARNING] Failed to clean up temporary files: {e}")
-        
         # Force final garbage collection
         gc.collect()
 
@@ -138,6 +167,8 @@ if __name__ == '__main__':
     parser.add_argument("-o", "--output", type=str, 
                         default="extracted_data.xlsx",
                         help="Name of the output Excel file (default: extracted_data.xlsx).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Run OCR again even on pages that were processed before.")
     
     args = parser.parse_args()
 
@@ -145,7 +176,7 @@ if __name__ == '__main__':
     # python main.py my_handwritten_notes.pdf -o my_notes_table.xlsx
     
     try:
-        success = run_extraction(args.pdf_file, args.output)
+        success = run_extraction(args.pdf_file, args.output, use_cache=not args.no_cache)
         if not success:
             print("\n[ERROR] Conversion failed. Please check the error messages above.")
             sys.exit(1)
@@ -7,19 +7,48 @@ Fully automated, robust solution that can handle any PDF document structure
 import os
 import gc
 import sys
-import shutil
+import queue
 import argparse
+import threading
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
 
-from pdf_processor import process_pdf
-from ocr_processor_easyocr import OCRProcessor
+from pdf_processor import count_pdf_pages, iter_pdf_pages
+from ocr_processor_easyocr import (ocr_images, retry_low_confidence, preload_ocr_models,
+                                   add_ocr_limit_arguments, apply_ocr_limits)
 from data_mapper_ai import AIDataMapper  # Use AI-powered data mapper
 from excel_exporter import export_to_excel
-from config import TEMP_IMAGE_DIR, OUTPUT_DIR
+from ocr_cache import pdf_digest, load_ocr_results, save_ocr_results
+from ocr_daemon import daemon_running, run_in_daemon, serve
+from pipeline import start_stage, PIPELINE_QUEUE_SIZE
+from config import OUTPUT_DIR
 
-def run_ai_extraction(pdf_path: str, output_excel_filename: str):
+# Output file name when a single PDF is converted without -o
+DEFAULT_OUTPUT = "ai_extracted_data.xlsx"
+
+# Writes finished workbooks while the next PDF is being converted
+_EXPORT_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="excel-export")
+
+def _export_excel(all_dataframes, output_excel_filename: str) -> bool:
+    """Step 4: write the tables to Excel, reporting failures instead of raising"""
+    try:
+        export_to_excel(all_dataframes, output_excel_filename)
+        return True
+    except Exception as e:
+        print(f"[ERROR] Failed to export to Excel: {e}")
+        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        return False
+
+def run_ai_extraction(pdf_path: str, output_excel_filename: str, use_cache: bool = True,
+                      pending_exports: Optional[List[Future]] = None):
     """
     AI-powered PDF to Excel conversion that automatically detects table structures.
+    OCR results are cached per PDF content, and per page image, unless use_cache is False.
+
+    If pending_exports is given, the Excel file is written in the background and
+    a Future resolving to the export's success is appended to it; the caller
+    must wait on it before relying on the file.
     """
     if not os.path.exists(pdf_path):
         print(f"[ERROR] PDF file not found: {pdf_path}")
@@ -31,93 +60,94 @@ def run_ai_extraction(pdf_path: str, output_excel_filename: str):
     print("🔍 No hardcoding - fully adaptive to any document structure")
 
     try:
-        # 1. Process PDF to Images
-        print("\n[Step 1/4] Converting PDF to images...")
-        image_paths = process_pdf(pdf_path)
-        if not image_paths:
-            print("[!] No images generated from PDF. Exiting.")
-            return False
+        stop = threading.Event()
+        stage_errors = []
 
-        # 2. Perform OCR on Images
-        print("\n[Step 2/4] Performing OCR (text recognition) on images...")
-        ocr_processor = None
-        all_extracted_data = []
-        
-        try:
-            ocr_processor = OCRProcessor()
-            
-            for i, img_path in enumerate(image_paths):
-                print(f"    Processing image {i+1}/{len(image_paths)}: {os.path.basename(img_path)}")
-                
-                try:
-                    text_results, table_results = ocr_processor.process_image(img_path)
-                    all_extracted_data.append({
-                        "image_path": img_path,
-                        "text_results": text_results,
-                        "table_results": table_results
-                    })
-                    
-                    # Force garbage collection after each image to free memory
-                    gc.collect()
-                    
-                except Exception as e:
-                    print(f"    [ERROR] Failed to process {img_path}: {e}")
-                    print(f"    [ERROR] Traceback: {traceback.format_exc()}")
-                    # Continue with other images instead of failing completely
-                    all_extracted_data.append({
-                        "image_path": img_path,
-                        "text_results": [],
-                        "table_results": []
-                    })
-                    continue
-                    
-        except Exception as e:
-            print(f"[ERROR] Failed to initialize or run OCR processor: {e}")
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
-            return False
-        finally:
-            # Clean up OCR processor
-            if ocr_processor:
-                try:
-                    del ocr_processor
-                    gc.collect()
-                except:
-                    pass
+        # Reuse the OCR results of an earlier run on the same PDF (same bytes)
+        digest = pdf_digest(pdf_path) if use_cache else None
+        cached_pages = load_ocr_results(digest) if digest else None
 
-        # 3. AI-Powered Data Mapping
-        print("\n[Step 3/4] AI-powered table structure detection and data mapping...")
+        if cached_pages is not None:
+            n_pages = len(cached_pages)
+            print(f"\n[Step 1-3/4] Reusing cached OCR results for {n_pages} page(s); running AI table detection...")
+            page_results = ((page["image_path"], (page["text_results"], page["table_results"]), None)
+                            for page in cached_pages)
+        else:
+            # 1-3. Render, OCR and map pages as a pipeline: each stage runs in its own
+            # thread and hands pages to the next through a bounded queue, so the
+            # first pages are being mapped while later ones are still rendering
+            print("\n[Step 1-3/4] Converting PDF to images, running OCR and AI table detection as a pipeline...")
+            n_pages = count_pdf_pages(pdf_path)
+            if not n_pages:
+                print("[!] No images generated from PDF. Exiting.")
+                return False
+
+            image_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+            ocr_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+            start_stage("renderer", lambda: iter_pdf_pages(pdf_path, n_pages), image_queue, stop, stage_errors)
+            start_stage("ocr", lambda: retry_low_confidence(ocr_images(iter(image_queue.get, None), total=n_pages,
+                                                                       use_cache=use_cache), pdf_path),
+                        ocr_queue, stop, stage_errors)
+            page_results = iter(ocr_queue.get, None)
+
+        all_extracted_data = []
         try:
             ai_mapper = AIDataMapper()
             all_dataframes = []
             
-            for page_data in all_extracted_data:
-                print(f"    🤖 Analyzing page: {os.path.basename(page_data['image_path'])}")
+            for img_path, results, error in page_results:
+                if error is not None:
+                    print(f"    [ERROR] Failed to process {img_path}: {error}")
+                    print(f"    [ERROR] Traceback: {''.join(traceback.format_exception(type(error), error, error.__traceback__))}")
+                    # Continue with other images instead of failing completely
+                    continue
+                
+                text_results, table_results = results
+                all_extracted_data.append({
+                    "image_path": img_path,
+                    "text_results": text_results,
+                    "table_results": table_results
+                })
+                print(f"    🤖 Analyzing page: {os.path.basename(img_path)}")
                 try:
-                    page_dfs = ai_mapper.process_ocr_outputs(
-                        page_data["text_results"], 
-                        page_data["table_results"]
-                    )
+                    page_dfs = ai_mapper.process_ocr_outputs(text_results, table_results)
                     all_dataframes.extend(page_dfs)
                 except Exception as e:
-                    print(f"    [WARNING] AI processing failed for {page_data['image_path']}: {e}")
+                    print(f"    [WARNING] AI processing failed for {img_path}: {e}")
                     continue
             
-            if not all_dataframes:
-                print("[!] AI could not detect any structured tables.")
-                return False
-                
         except Exception as e:
             print(f"[ERROR] AI data mapping failed: {e}")
             print(f"[ERROR] Traceback: {traceback.format_exc()}")
             return False
+        finally:
+            # Unblock and stop the upstream stages if mapping ended early
+            stop.set()
+
+        if stage_errors:
+            name, e = stage_errors[0]
+            print(f"[ERROR] Pipeline stage '{name}' failed: {e}")
+            print(f"[ERROR] Traceback: {''.join(traceback.format_exception(type(e), e, e.__traceback__))}")
+            return False
+
+        # Cache the OCR results once every page went through, so reruns skip straight to mapping
+        if digest and cached_pages is None and len(all_extracted_data) == n_pages:
+            save_ocr_results(digest, pdf_path, all_extracted_data)
+
+        if not all_dataframes:
+            print("[!] AI could not detect any structured tables.")
+            return False
 
         # 4. Export to Excel
         print("\n[Step 4/4] Exporting AI-detected data to Excel...")
-        try:
-            export_to_excel(all_dataframes, output_excel_filename)
-        except Exception as e:
-            print(f"[ERROR] Failed to export to Excel: {e}")
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        if pending_exports is not None:
+            # Write the workbook on a background thread so the caller can move on to the
+            # next PDF; the caller reports whether it was saved once the export is done
+            pending_exports.append(_EXPORT_POOL.submit(_export_excel, all_dataframes, output_excel_filename))
+            print(f"📊 Detected and structured {len(all_dataframes)} table(s)")
+            print(f"📁 Queued for export to: {os.path.join(OUTPUT_DIR, output_excel_filename)}")
+            return True
+        if not _export_excel(all_dataframes, output_excel_filename):
             return False
 
         print("\n===== 🎉 AI Conversion Complete! =====")
@@ -132,17 +162,70 @@ def run_ai_extraction(pdf_path: str, output_excel_filename: str):
         return False
         
     finally:
-        # Clean up temporary images
-        try:
-            if os.path.exists(TEMP_IMAGE_DIR):
-                print(f"[*] Cleaning up temporary images in '{TEMP_IMAGE_DIR}'...")
-                shutil.rmtree(TEMP_IMAGE_DIR)
-        except Exception as e:
-            print(f"[WARNING] Failed to clean up temporary files: {e}")
-        
         # Force final garbage collection
         gc.collect()
 
+def _batch_output_name(pdf_path: str) -> str:
+    """Output file of a PDF converted as part of a batch: '<pdf name>.xlsx'"""
+    return os.path.splitext(os.path.basename(pdf_path))[0] + ".xlsx"
+
+def _run_in_daemon(pdf_paths: List[str], output: Optional[str], use_cache: bool = True) -> Optional[bool]:
+    """
+    Sends the conversions to a running daemon (see --serve), which already has the
+    OCR models loaded. Returns None if no daemon is running, so the caller
+    converts in-process instead.
+    """
+    if not daemon_running():
+        return None
+    print("[*] Sending conversion to the running daemon...")
+    failed = 0
+    for pdf_path in pdf_paths:
+        if len(pdf_paths) == 1:
+            output_excel_filename = output or DEFAULT_OUTPUT
+        else:
+            output_excel_filename = _batch_output_name(pdf_path)
+        if not run_in_daemon(pdf_path, output_excel_filename, use_cache=use_cache):
+            failed += 1
+    if failed and len(pdf_paths) > 1:
+        print(f"\n[!] {failed} of {len(pdf_paths)} PDF(s) could not be converted.")
+    return not failed
+
+def _serve() -> bool:
+    """Loads the OCR models and serves conversion requests until interrupted"""
+    print("[*] Loading OCR models for the conversion daemon...")
+    preload_ocr_models()
+    return serve(run_ai_extraction)
+
+def _run_batch(pdf_paths: List[str], use_cache: bool = True) -> bool:
+    """
+    Converts several PDFs, each to '<pdf name>.xlsx'. Each workbook is written in
+    the background while the next PDF goes through OCR; returns True only if
+    every conversion and export succeeded.
+    """
+    pending_exports = []
+    export_names = []
+    failed = 0
+    for pdf_path in pdf_paths:
+        output_excel_filename = _batch_output_name(pdf_path)
+        queued = len(pending_exports)
+        if not run_ai_extraction(pdf_path, output_excel_filename, use_cache=use_cache,
+                                 pending_exports=pending_exports):
+            failed += 1
+        export_names.extend([output_excel_filename] * (len(pending_exports) - queued))
+
+    # Wait for the workbooks still being written
+    print()
+    for output_excel_filename, future in zip(export_names, pending_exports):
+        output_path = os.path.join(OUTPUT_DIR, output_excel_filename)
+        if future.result():
+            print(f"📁 Output saved to: {output_path}")
+        else:
+            print(f"[ERROR] Could not write {output_path}")
+            failed += 1
+    if failed:
+        print(f"\n[!] {failed} of {len(pdf_paths)} PDF(s) could not be converted.")
+    return not failed
+
 def main():
     """Main function with enhanced argument parsing"""
     parser = argparse.ArgumentParser(
@@ -153,6 +236,8 @@ Examples:
   python main_ai.py document.pdf
   python main_ai.py "Manufacturing Parts.pdf" -o parts_data.xlsx
   python main_ai.py invoice.pdf -o invoice_data.xlsx
+  python main_ai.py january.pdf february.pdf march.pdf
+  python main_ai.py --serve    # keep the OCR models loaded for later runs
 
 Features:
   🤖 AI-powered table detection
@@ -163,15 +248,45 @@ Features:
         """
     )
     
-    parser.add_argument("pdf_file", type=str, help="Path to the input PDF file")
+    parser.add_argument("pdf_files", type=str, nargs="*", metavar="pdf_file",
+                        help="Path to the input PDF file (several may be given)")
     parser.add_argument("-o", "--output", type=str, 
-                        default="ai_extracted_data.xlsx",
-                        help="Name of the output Excel file (default: ai_extracted_data.xlsx)")
+                        default=None,
+                        help="Name of the output Excel file (default: ai_extracted_data.xlsx; "
+                             "with several PDFs each output is named after its PDF)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Run OCR again even if this PDF was processed before")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a daemon that keeps the OCR models loaded; later "
+                             "invocations hand their PDFs to it")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="Convert in this process even if a daemon is running")
     
+    add_ocr_limit_arguments(parser)
     args = parser.parse_args()
+    # With --serve these apply to every conversion the daemon runs; a client's own
+    # limits only apply when it converts in-process
+    apply_ocr_limits(args)
+    if args.serve:
+        if args.pdf_files:
+            parser.error("--serve takes no PDF files")
+        sys.exit(0 if _serve() else 1)
+    if not args.pdf_files:
+        parser.error("at least one PDF file is required")
+    if args.output and len(args.pdf_files) > 1:
+        parser.error("-o/--output can only be used with a single PDF")
 
     try:
-        success = run_ai_extraction(args.pdf_file, args.output)
+        success = None
+        if not args.no_daemon:
+            success = _run_in_daemon(args.pdf_files, args.output, use_cache=not args.no_cache)
+        if success is None:
+            # No daemon running: convert in this process
+            if len(args.pdf_files) == 1:
+                success = run_ai_extraction(args.pdf_files[0], args.output or DEFAULT_OUTPUT,
+                                            use_cache=not args.no_cache)
+            else:
+                success = _run_batch(args.pdf_files, use_cache=not args.no_cache)
         if not success:
             print("\n❌ [ERROR] AI conversion failed. Please check the error messages above.")
             sys.exit(1)
@@ -2,19 +2,21 @@
 import os
 import gc
 import sys
-import shutil
 import argparse
 import traceback
 
-from pdf_processor import process_pdf
-from ocr_processor_easyocr import OCRProcessor  # Use EasyOCR version
+from pdf_processor import count_pdf_pages, iter_pdf_pages
+from ocr_processor_easyocr import ocr_images, retry_low_confidence, add_ocr_limit_arguments, apply_ocr_limits  # Use EasyOCR version
 from data_mapper import DataMapper
 from excel_exporter import export_to_excel
-from config import TEMP_IMAGE_DIR, OUTPUT_DIR
+from ocr_cache import pdf_digest, load_ocr_results, save_ocr_results
+from text_results import TextResults
+from config import OUTPUT_DIR
 
-def run_extraction(pdf_path: str, output_excel_filename: str):
+def run_extraction(pdf_path: str, output_excel_filename: str, use_cache: bool = True):
     """
     Main function to run the PDF to Excel conversion process using EasyOCR.
+    OCR results are cached per PDF content, and per page image, unless use_cache is False.
     """
     if not os.path.exists(pdf_path):
         print(f"[ERROR] PDF file not found: {pdf_path}")
@@ -24,65 +26,67 @@ def run_extraction(pdf_path: str, output_excel_filename: str):
     print("[INFO] Using EasyOCR for text recognition")
 
     try:
-        # 1. Process PDF to Images
-        print("\n[Step 1/4] Converting PDF to images...")
-        image_paths = process_pdf(pdf_path)
-        if not image_paths:
-            print("[!] No images generated from PDF. Exiting.")
-            return False
+        # Reuse the OCR results of an earlier run on the same PDF (same bytes)
+        digest = pdf_digest(pdf_path) if use_cache else None
+        all_extracted_data = load_ocr_results(digest) if digest else None
+
+        if all_extracted_data is not None:
+            print(f"\n[Step 1-2/4] Reusing cached OCR results for {len(all_extracted_data)} page(s)...")
+        else:
+            # 1-2. Render the PDF page by page and OCR each page straight from memory
+            print("\n[Step 1-2/4] Converting PDF to images and performing OCR (text recognition)...")
+            n_pages = count_pdf_pages(pdf_path)
+            if not n_pages:
+                print("[!] No images generated from PDF. Exiting.")
+                return False
 
-        # 2. Perform OCR on Images
-        print("\n[Step 2/4] Performing OCR (text recognition) on images...")
-        ocr_processor = None
-        all_extracted_data = []
+            all_extracted_data = []
+            failed_pages = 0
         
-        try:
-            ocr_processor = OCRProcessor()
-            
-            for i, img_path in enumerate(image_paths):
-                print(f"    Processing image {i+1}/{len(image_paths)}: {os.path.basename(img_path)}")
+            try:
+                page_results = ocr_images(iter_pdf_pages(pdf_path, n_pages), total=n_pages, use_cache=use_cache)
+                for img_path, results, error in retry_low_confidence(page_results, pdf_path):
+                    if error is not None:
+                        print(f"    [ERROR] Failed to process {img_path}: {error}")
+                        print(f"    [ERROR] Traceback: {''.join(traceback.format_exception(type(error), error, error.__traceback__))}")
+                        # Continue with other images instead of failing completely
+                        results = ([], [])
+                        failed_pages += 1
                 
-                try:
-                    text_results, table_results = ocr_processor.process_image(img_path)
+                    text_results, table_results = results
                     all_extracted_data.append({
                         "image_path": img_path,
                         "text_results": text_results,
                         "table_results": table_results
                     })
                     
-                    # Force garbage collection after each image to free memory
-                    gc.collect()
-                    
-                except Exception as e:
-                    print(f"    [ERROR] Failed to process {img_path}: {e}")
-                    print(f"    [ERROR] Traceback: {traceback.format_exc()}")
-                    # Continue with other images instead of failing completely
-                    all_extracted_data.append({
-                        "image_path": img_path,
-                        "text_results": [],
-                        "table_results": []
-                    })
-                    continue
-                    
-        except Exception as e:
-            print(f"[ERROR] Failed to initialize or run OCR processor: {e}")
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
-            return False
-        finally:
-            # Clean up OCR processor
-            if ocr_processor:
-                try:
-                    del ocr_processor
-                    gc.collect()
-                except:
-                    pass
+            except Exception as e:
+                print(f"[ERROR] Failed to initialize or run OCR processor: {e}")
+                print(f"[ERROR] Traceback: {traceback.format_exc()}")
+                return False
+
+            # Only cache a complete run, so failed pages are retried next time
+            if digest and not failed_pages:
+                save_ocr_results(digest, pdf_path, all_extracted_data)
 
         # 3. Map OCR Results to Structured Data
         print("\n[Step 3/4] Mapping OCR results to structured tables...")
         try:
             data_mapper = DataMapper()
             all_dataframes = []
+            # Columns of the text-only fallback table, gathered in the same pass; they
+            # only reference the OCR'd strings, so keeping them costs a pointer per text
+            texts, confidences, pages = [], [], []
             for page_data in all_extracted_data:
+                text_results = page_data["text_results"]
+                if isinstance(text_results, TextResults):
+                    texts.extend(text_results.text)
+                    confidences.extend(text_results.confidence.tolist())
+                else:
+                    texts.extend(text_result.get("text", "") for text_result in text_results)
+                    confidences.extend(text_result.get("confidence", 0) for text_result in text_results)
+                pages.extend([os.path.basename(page_data["image_path"])] * len(text_results))
+
                 # Pass both text and table results from the current page
                 try:
                     page_dfs = data_mapper.process_ocr_outputs(
@@ -100,18 +104,14 @@ def run_extraction(pdf_path: str, output_excel_filename: str):
                 print("[INFO] Creating a simple table from all detected text...")
                 
                 # Create a simple fallback table from all text
-                all_text_data = []
-                for page_data in all_extracted_data:
-                    for text_result in page_data["text_results"]:
-                        all_text_data.append({
-                            "Text": text_result.get("text", ""),
-                            "Confidence": text_result.get("confidence", 0),
-                            "Page": os.path.basename(page_data["image_path"])
-                        })
-                
-                if all_text_data:
+                if texts:
+                    import numpy as np
                     import pandas as pd
-                    df = pd.DataFrame(all_text_data)
+                    df = pd.DataFrame({
+                        "Text": texts,
+                        "Confidence": np.asarray(confidences, dtype=np.float64),
+                        "Page": pages
+                    })
                     all_dataframes = [df]
                 else:
                     print("[!] No text data found. Exiting.")
@@ -141,14 +141,6 @@ def run_extraction(pdf_path: str, output_excel_filename: str):
         return False
         
     finally:
-        # Clean up temporary images
-        try:
-            if os.path.exists(TEMP_IMAGE_DIR):
-                print(f"[*] Cleaning up temporary images in '{TEMP_IMAGE_DIR}'...")
-                shutil.rmtree(TEMP_IMAGE_DIR)
-        except Exception as e:
-            print(f"[WARNING] Failed to clean up temporary files: {e}")
-        
         # Force final garbage collection
         gc.collect()
 
@@ -158,14 +150,18 @@ if __name__ == '__main__':
     parser.add_argument("-o", "--output", type=str, 
                         default="extracted_data.xlsx",
                         help="Name of the output Excel file (default: extracted_data.xlsx).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Run OCR again even if this PDF was processed before.")
     
+    add_ocr_limit_arguments(parser)
     args = parser.parse_args()
+    apply_ocr_limits(args)
 
     # Example Usage:
     # python main_easyocr.py my_handwritten_notes.pdf -o my_notes_table.xlsx
     
     try:
-        success = run_extraction(args.pdf_file, args.output)
+        success = run_extraction(args.pdf_file, args.output, use_cache=not args.no_cache)
         if not success:
             print("\n[ERROR] Conversion failed. Please check the error messages above.")
             sys.exit(1)
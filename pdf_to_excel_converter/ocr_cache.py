@@ -0,0 +1,186 @@
+# Persistent cache of OCR results per PDF and per page image # ocr_cache.py
+import os
+import json
+import time
+import pickle
+import hashlib
+import numpy as np
+from functools import lru_cache
+from importlib import metadata
+from typing import Dict, List, Optional, Tuple, Union
+
+from config import OUTPUT_DIR, OCR_CONFIG, RENDER_DPI, RENDER_GRAYSCALE, RETRY_DPI
+from pdf_processor import RENDERER
+from page_image import PageImage
+
+CACHE_DIR = os.path.join(OUTPUT_DIR, ".cache", "ocr")
+INDEX_PATH = os.path.join(CACHE_DIR, "index.json")
+# Results of single page images, by content; see page_digest()
+PAGE_CACHE_DIR = os.path.join(CACHE_DIR, "pages")
+
+# Bump whenever rendering or OCR code changes what gets cached, so older
+# entries stop matching
+CACHE_VERSION = 2
+
+@lru_cache(maxsize=None)
+def _package_version(package: str) -> Optional[str]:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+def _ocr_settings() -> Dict:
+    """Everything besides the PDF itself that the cached OCR results depend on"""
+    return {
+        "cache_version": CACHE_VERSION,
+        "render_dpi": RENDER_DPI,
+        "grayscale": RENDER_GRAYSCALE,
+        "retry": [RETRY_DPI, OCR_CONFIG.get("retry_confidence")],
+        "renderer": RENDERER,
+        "lang": OCR_CONFIG.get("lang"),
+        "use_angle_cls": OCR_CONFIG.get("use_angle_cls"),
+        "use_gpu": OCR_CONFIG.get("use_gpu"),
+        "ocr_max_side": OCR_CONFIG.get("ocr_max_side"),
+        # Crops in one recognizer batch are padded to a common width
+        "rec_batch_size": OCR_CONFIG.get("rec_batch_size"),
+        "tiling": [OCR_CONFIG.get(key) for key in ("tile_large_pages", "tile_min_size", "tile_grid", "tile_overlap")],
+        "easyocr": _package_version("easyocr"),
+    }
+
+def pdf_digest(pdf_path: str) -> str:
+    """
+    Hashes the PDF's bytes together with the render and OCR settings, so the
+    same document is recognized whatever its name or location, while any edit
+    to it, or a change of DPI, renderer, OCR configuration, EasyOCR version or
+    CACHE_VERSION, invalidates the cached results.
+
+    Args:
+        pdf_path (str): The path to the PDF file.
+
+    Returns:
+        str: The SHA-1 hex digest of the file contents and settings.
+    """
+    h = hashlib.sha1()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    h.update(json.dumps(_ocr_settings(), sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+def _ocr_path(digest: str) -> str:
+    return os.path.join(CACHE_DIR, digest, "ocr.pkl")
+
+def _write_atomic(path: str, data: bytes):
+    """Write through a temp file so an interrupted run never leaves a partial file"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def load_ocr_results(digest: str) -> Optional[List[Dict]]:
+    """
+    Returns the cached per-page OCR results for a PDF digest, or None when the
+    PDF has not been processed yet (or its cache entry is unreadable).
+    """
+    ocr_path = _ocr_path(digest)
+    if not os.path.exists(ocr_path):
+        return None
+    try:
+        with open(ocr_path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        # Corrupt or incompatible cache entry; the caller runs OCR again
+        return None
+
+def save_ocr_results(digest: str, pdf_path: str, all_extracted_data: List[Dict]):
+    """
+    Stores the per-page OCR results for a PDF and records it in the index.
+
+    Args:
+        digest (str): The PDF's digest from pdf_digest().
+        pdf_path (str): The path the PDF was processed from (informational).
+        all_extracted_data (List[Dict]): One dict per page with 'image_path',
+            'text_results' and 'table_results'.
+    """
+    try:
+        os.makedirs(os.path.dirname(_ocr_path(digest)), exist_ok=True)
+        _write_atomic(_ocr_path(digest), pickle.dumps(all_extracted_data, protocol=pickle.HIGHEST_PROTOCOL))
+
+        try:
+            with open(INDEX_PATH, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index[digest] = {
+            "pdf_path": os.path.abspath(pdf_path),
+            "timestamp": time.time(),
+            "n_pages": len(all_extracted_data),
+            "settings": _ocr_settings(),
+        }
+        _write_atomic(INDEX_PATH, json.dumps(index, indent=2).encode("utf-8"))
+    except OSError as e:
+        print(f"[WARNING] Could not write OCR cache for {pdf_path}: {e}")
+
+def page_digest(image: Union[str, PageImage], engine: str = "easyocr", use_angle_cls: Optional[bool] = None) -> str:
+    """
+    Hashes a page image's content together with the OCR settings, so a page
+    that was read before (e.g. in an earlier version of an edited PDF) is
+    recognized whatever document or file it comes from.
+
+    BLAKE2b is used since this is a cache key, not a signature, and it hashes
+    the ~25 MB of a 300 DPI page faster than SHA-1.
+
+    Args:
+        image (Union[str, PageImage]): An image file, or a page rendered in memory.
+        engine (str): The package doing the OCR ("easyocr" or "paddleocr"); its
+            version is part of the key.
+        use_angle_cls (Optional[bool]): Whether PaddleOCR read this page with the angle
+            classifier, for engines that decide that per page.
+
+    Returns:
+        str: The hex digest to pass to load_page_results() and save_page_results().
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(image, PageImage):
+        pixels = np.ascontiguousarray(image.pixels)
+        # The scale decides the coordinates the boxes are reported in
+        h.update(f"{pixels.shape} {pixels.dtype} {image.scale}".encode("utf-8"))
+        h.update(pixels.data)
+    else:
+        with open(image, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    settings = dict(_ocr_settings(), engine=engine, engine_version=_package_version(engine))
+    if use_angle_cls is not None:
+        settings["page_angle_cls"] = use_angle_cls
+    h.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+def _page_path(digest: str) -> str:
+    return os.path.join(PAGE_CACHE_DIR, digest[:2], f"{digest}.pkl")
+
+def load_page_results(digest: str) -> Optional[Tuple]:
+    """Returns the cached (text_results, table_results) of a page digest, or None"""
+    page_path = _page_path(digest)
+    if not os.path.exists(page_path):
+        return None
+    try:
+        with open(page_path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        # Corrupt or incompatible cache entry; the caller runs OCR again
+        return None
+
+def save_page_results(digest: str, results: Tuple):
+    """
+    Stores a page's (text_results, table_results) under its digest. Pages
+    without any text are not stored: OCR errors also come back empty, and a
+    blank page is quick to read again.
+    """
+    if not len(results[0]):
+        return
+    try:
+        os.makedirs(os.path.dirname(_page_path(digest)), exist_ok=True)
+        _write_atomic(_page_path(digest), pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError as e:
+        print(f"[WARNING] Could not write OCR cache for a page: {e}")
@@ -0,0 +1,189 @@
+# Local daemon that keeps the OCR models loaded between conversions # ocr_daemon.py
+import os
+import sys
+import json
+import signal
+import socket
+import threading
+import contextlib
+import traceback
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Optional
+
+SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".cache", "pk_ai", "daemon.sock")
+
+# Unix sockets are not available on every platform (e.g. older Windows builds)
+DAEMON_SUPPORTED = hasattr(socket, "AF_UNIX")
+
+# A conversion changes the working directory and stdout of the whole process,
+# so only one may run at a time
+_REQUEST_LOCK = threading.Lock()
+
+def _send(conn, message: dict):
+    conn.send_bytes(json.dumps(message).encode("utf-8"))
+
+def _receive(conn) -> dict:
+    return json.loads(conn.recv_bytes().decode("utf-8"))
+
+class _ClientWriter:
+    """
+    Stands in for stdout while the daemon converts a PDF, forwarding each
+    printed line to the client. Pipeline threads print too, hence the lock.
+    If the client has gone away, output is dropped and the conversion goes on.
+    """
+    def __init__(self, conn):
+        self.conn = conn
+        self.buffer = ""
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        with self.lock:
+            self.buffer += text
+            if "\n" in self.buffer:
+                self._send_buffer()
+        return len(text)
+
+    def flush(self):
+        with self.lock:
+            self._send_buffer()
+
+    def _send_buffer(self):
+        if self.buffer and not self.closed:
+            try:
+                _send(self.conn, {"log": self.buffer})
+            except OSError:
+                self.closed = True
+        self.buffer = ""
+
+def daemon_running(socket_path: str = SOCKET_PATH) -> bool:
+    """True if a daemon is accepting connections on socket_path"""
+    if not DAEMON_SUPPORTED or not os.path.exists(socket_path):
+        return False
+    try:
+        Client(socket_path, family="AF_UNIX").close()
+        return True
+    except OSError:
+        return False
+
+def serve(convert: Callable[..., bool], socket_path: str = SOCKET_PATH) -> bool:
+    """
+    Runs the conversion daemon until interrupted.
+
+    Requests are handled one at a time in this process (further clients wait in
+    the socket's backlog), so the OCR readers and worker pool loaded by the
+    first conversion are reused by every later one. Each conversion runs in the
+    client's working directory, with its output streamed back to the client.
+
+    Args:
+        convert (Callable[..., bool]): Called as convert(pdf_path, output_excel_filename,
+            use_cache=...) for each request; returns whether the conversion succeeded.
+        socket_path (str): The Unix socket to listen on.
+
+    Returns:
+        bool: False if the daemon could not be started.
+    """
+    if not DAEMON_SUPPORTED:
+        print("[ERROR] The conversion daemon needs Unix domain sockets, which this platform lacks.")
+        return False
+
+    socket_dir = os.path.dirname(socket_path)
+    os.makedirs(socket_dir, exist_ok=True)
+    # Only this user may connect: requests name files to read and write
+    os.chmod(socket_dir, 0o700)
+    if os.path.exists(socket_path):
+        if daemon_running(socket_path):
+            print(f"[ERROR] A conversion daemon is already listening on {socket_path}")
+            return False
+        # Left behind by a daemon that was killed
+        os.remove(socket_path)
+
+    # The backlog lets clients queue up while a conversion is running
+    listener = Listener(socket_path, family="AF_UNIX", backlog=16)
+    # Stop cleanly (removing the socket) when a service manager terminates us
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"[*] Conversion daemon listening on {socket_path} (Ctrl+C to stop)")
+    try:
+        while True:
+            with listener.accept() as conn:
+                _handle_request(conn, convert)
+    except KeyboardInterrupt:
+        print("\n[INFO] Conversion daemon stopped.")
+    finally:
+        # Also removes the socket file
+        listener.close()
+    return True
+
+def _handle_request(conn, convert: Callable[..., bool]):
+    """Runs one conversion for a client, streaming its output back"""
+    try:
+        request = _receive(conn)
+    except (EOFError, OSError, ValueError):
+        # A client that only checked whether the daemon is running
+        return
+
+    print(f"[*] Converting '{request['pdf_path']}' -> {request['output']}")
+    writer = _ClientWriter(conn)
+    success = False
+    with _REQUEST_LOCK:
+        daemon_cwd = os.getcwd()
+        try:
+            with contextlib.redirect_stdout(writer):
+                try:
+                    # Relative paths (and OUTPUT_DIR) resolve as in the client
+                    os.chdir(request["cwd"])
+                    success = bool(convert(request["pdf_path"], request["output"],
+                                           use_cache=request["use_cache"]))
+                except Exception as e:
+                    print(f"[ERROR] Conversion failed in the daemon: {e}")
+                    print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        finally:
+            os.chdir(daemon_cwd)
+            writer.flush()
+
+    try:
+        _send(conn, {"result": success})
+    except OSError:
+        pass
+    print(f"[*] {'Done' if success else 'Failed'}: '{request['pdf_path']}'")
+
+def run_in_daemon(pdf_path: str, output_excel_filename: str, use_cache: bool = True,
+                  socket_path: str = SOCKET_PATH) -> Optional[bool]:
+    """
+    Has a running daemon convert a PDF, printing its output as it arrives.
+
+    Args:
+        pdf_path (str): The PDF to convert.
+        output_excel_filename (str): The name of the Excel file to write in OUTPUT_DIR.
+        use_cache (bool): Whether the daemon may reuse cached OCR results.
+        socket_path (str): The daemon's Unix socket.
+
+    Returns:
+        Optional[bool]: Whether the conversion succeeded, or None if no daemon is
+        running (the caller should then convert in-process).
+    """
+    if not DAEMON_SUPPORTED or not os.path.exists(socket_path):
+        return None
+    try:
+        conn = Client(socket_path, family="AF_UNIX")
+    except OSError:
+        return None
+
+    with conn:
+        try:
+            _send(conn, {
+                "pdf_path": os.path.abspath(pdf_path),
+                "output": output_excel_filename,
+                "use_cache": use_cache,
+                "cwd": os.getcwd(),
+            })
+            while True:
+                message = _receive(conn)
+                if "log" in message:
+                    sys.stdout.write(message["log"])
+                    sys.stdout.flush()
+                else:
+                    return bool(message.get("result"))
+        except (EOFError, OSError) as e:
+            print(f"[ERROR] Lost connection to the conversion daemon: {e or 'connection closed'}")
+            return False
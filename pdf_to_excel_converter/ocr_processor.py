@@ -3,16 +3,23 @@ import os
 import gc
 import logging
 import traceback
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from paddleocr import PaddleOCR
 from PIL import Image
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Union
 
 from config import OCR_CONFIG
+from bbox_utils import int_bboxes
+from page_image import PageImage, page_name, page_scale, ocr_input
 
 # Set up a specific logger for PaddleOCR to control its output
 # This prevents it from flooding the console with info-level messages
 # You can adjust the level (e.g., logging.DEBUG) and log file path as needed
 logging.getLogger("ppocr").setLevel(logging.ERROR)
+# Per-page details are logged at DEBUG, so they are only formatted when enabled
+logger = logging.getLogger(__name__)
 # To save to a file instead, you could use:
 # logging.basicConfig(
 #     level=logging.INFO,
@@ -21,10 +28,44 @@ logging.getLogger("ppocr").setLevel(logging.ERROR)
 #     filemode='a'
 # )
 
+def paddle_hpi_options() -> Dict[str, Any]:
+    """
+    Extra PaddleOCR arguments turning on high-performance inference when the
+    USE_HPI environment variable is set (PaddleOCR 3.0+). HPI runs the models on
+    the fastest installed backend (OpenVINO or ONNX Runtime on CPU); on the GPU,
+    TensorRT at FP16 is requested as well.
+    """
+    if os.environ.get("USE_HPI", "").lower() not in ("1", "true", "yes"):
+        return {}
+    options = {"enable_hpi": True}
+    if OCR_CONFIG.get("use_gpu", False):
+        options.update(use_tensorrt=True, precision="fp16")
+    return options
+
+def create_paddle_ocr(**kwargs) -> PaddleOCR:
+    """
+    Creates a PaddleOCR instance with paddle_hpi_options() applied. If this
+    PaddleOCR version (or the installed backends) can't run with them, the
+    stock inference path is used instead.
+    """
+    hpi_options = paddle_hpi_options()
+    if hpi_options:
+        try:
+            return PaddleOCR(**kwargs, **hpi_options)
+        except Exception as e:
+            print(f"[WARNING] High-performance inference unavailable, using the default backend: {e}")
+    return PaddleOCR(**kwargs)
+
+def _scale_box(coords, scale: float):
+    """Maps a box from page pixels to COORDINATE_DPI (see page_scale)"""
+    return coords if scale == 1.0 else np.asarray(coords[:4], dtype=np.float64) * scale
+
 class OCRProcessor:
     def __init__(self):
         self.ocr_text = None
         self.ocr_table = None
+        # Runs the table pass alongside the text pass; PaddlePaddle releases the GIL during inference
+        self._table_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="table-ocr")
         self._initialize_ocr()
 
     def _initialize_ocr(self):
@@ -32,16 +73,17 @@ class OCRProcessor:
         try:
             print("[*] Initializing OCR models...")
             # Initialize PaddleOCR for text detection and recognition
-            self.ocr_text = PaddleOCR(
+            self.ocr_text = create_paddle_ocr(
                 lang=OCR_CONFIG["lang"],
                 use_angle_cls=OCR_CONFIG["use_angle_cls"],
+                rec_batch_num=OCR_CONFIG.get("rec_batch_size", 6),
             )
             print("[*] Text OCR model initialized successfully")
             
             # Initialize PaddleOCR for table recognition (structure only)
             # The new API is more streamlined. We specify the table pipeline
             # through other configurations, not these boolean flags.
-            self.ocr_table = PaddleOCR(
+            self.ocr_table = create_paddle_ocr(
                 lang=OCR_CONFIG["lang"],
             )
             print("[*] Table OCR model initialized successfully")
@@ -51,22 +93,24 @@ class OCRProcessor:
             print(f"[ERROR] Traceback: {traceback.format_exc()}")
             raise
 
-    def process_image(self, image_path: str) -> Tuple[List[Dict], List[Dict]]:
+    def process_image(self, image_path: Union[str, PageImage], use_angle_cls: bool = False) -> Tuple[List[Dict], List[Dict]]:
         """
         Performs text and table recognition on a given image with robust error handling.
 
         Args:
-            image_path (str): The path to the input image file.
+            image_path (Union[str, PageImage]): The path to the input image file, or a page rendered in memory.
+            use_angle_cls (bool): Run the angle classifier on this page (e.g. a scan) even if
+                OCR_CONFIG["use_angle_cls"] is off; that model is loaded on first use.
 
         Returns:
             Tuple[List[Dict], List[Dict]]: A tuple containing:
                 - List of text detection/recognition results (each dict has 'bbox' and 'text').
                 - List of table detection/structure results (each dict has 'bbox' and 'rec_res' (HTML)).
         """
-        print(f"[*] Processing image for OCR: {os.path.basename(image_path)}")
+        logger.debug("Processing image for OCR: %s", page_name(image_path))
         
         # Validate input
-        if not os.path.exists(image_path):
+        if not isinstance(image_path, PageImage) and not os.path.exists(image_path):
             print(f"[ERROR] Image file not found: {image_path}")
             return [], []
         
@@ -74,102 +118,102 @@ class OCRProcessor:
         table_results = []
         
         try:
-            # Process text OCR with error handling
-            text_results = self._process_text_ocr(image_path)
-            
-            # Force garbage collection to free memory
-            gc.collect()
-            
-            # Process table OCR with error handling
-            table_results = self._process_table_ocr(image_path)
-            
-            # Force garbage collection again
-            gc.collect()
+            # Decode the page once (in-memory pages are used as they are); both passes take the array
+            image = ocr_input(image_path)
+            # The text and table models are separate PaddleOCR instances, so the
+            # table pass runs on a helper thread while this one does the text pass
+            scale = page_scale(image_path)
+            table_future = self._table_executor.submit(self._process_table_ocr, image, scale)
+            try:
+                # Process text OCR with error handling
+                text_results = self._process_text_ocr(image, scale, self._text_model(use_angle_cls))
+            finally:
+                # Process table OCR with error handling
+                table_results = table_future.result()
             
         except Exception as e:
-            print(f"[ERROR] OCR processing failed for {image_path}: {e}")
+            print(f"[ERROR] OCR processing failed for {page_name(image_path)}: {e}")
             print(f"[ERROR] Traceback: {traceback.format_exc()}")
             # Return empty results instead of crashing
             return [], []
 
-        print(f"    - Found {len(text_results)} text lines.")
-        print(f"    - Found {len(table_results)} tables.")
+        logger.debug("Found %d text lines and %d tables", len(text_results), len(table_results))
         return text_results, table_results
 
-    def _process_text_ocr(self, image_path: str) -> List[Dict]:
-        """Process text OCR with error handling"""
+    def _text_model(self, use_angle_cls: bool) -> PaddleOCR:
+        """The text model, or the shared one with the angle classifier when a page needs it"""
+        if use_angle_cls and not OCR_CONFIG["use_angle_cls"]:
+            return get_paddle_ocr(OCR_CONFIG["lang"], True)
+        return self.ocr_text
+
+    def _process_text_ocr(self, image: Union[str, np.ndarray], scale: float = 1.0, ocr_text: Optional[PaddleOCR] = None) -> List[Dict]:
+        """Process text OCR with error handling on an image path or decoded BGR array; boxes are multiplied by scale"""
         text_results = []
         try:
-            print(f"    - Running text OCR...")
+            logger.debug("Running text OCR")
             # Perform general text OCR (detection and recognition)
-            text_results_raw = self.ocr_text.ocr(image_path)
+            text_results_raw = (ocr_text or self.ocr_text).ocr(image)
             
             # Flatten the result structure
             if text_results_raw and len(text_results_raw) > 0 and text_results_raw[0]:
+                lines = []
                 for line in text_results_raw[0]:
                     try:
-                        if line and len(line) >= 2:
-                            # Extract bounding box coordinates
-                            bbox_coords = line[0]
-                            if len(bbox_coords) >= 4:
-                                bbox = [
-                                    [int(p) for p in bbox_coords[0]],
-                                    [int(p) for p in bbox_coords[1]],
-                                    [int(p) for p in bbox_coords[2]],
-                                    [int(p) for p in bbox_coords[3]]
-                                ]
-                                
-                                # Extract text and confidence
-                                text_info = line[1]
-                                if isinstance(text_info, (list, tuple)) and len(text_info) >= 2:
-                                    text = text_info[0]
-                                    confidence = text_info[1]
-                                    text_results.append({
-                                        "bbox": bbox, 
-                                        "text": text, 
-                                        "confidence": confidence
-                                    })
+                        # Keep lines with a 4-point bounding box and a (text, confidence) pair
+                        if line and len(line) >= 2 and len(line[0]) >= 4:
+                            text_info = line[1]
+                            if isinstance(text_info, (list, tuple)) and len(text_info) >= 2:
+                                lines.append(line)
                     except Exception as e:
                         print(f"    [WARNING] Failed to process text line: {e}")
                         continue
+
+                # Convert all bounding box coordinates in one cast
+                bboxes = int_bboxes([_scale_box(line[0], scale) for line in lines])
+                for line, bbox in zip(lines, bboxes):
+                    if bbox is not None:
+                        text_results.append({
+                            "bbox": bbox, 
+                            "text": line[1][0], 
+                            "confidence": line[1][1]
+                        })
                         
         except Exception as e:
             print(f"    [ERROR] Text OCR failed: {e}")
             
         return text_results
 
-    def _process_table_ocr(self, image_path: str) -> List[Dict]:
-        """Process table OCR with error handling"""
+    def _process_table_ocr(self, image: Union[str, np.ndarray], scale: float = 1.0) -> List[Dict]:
+        """Process table OCR with error handling on an image path or decoded BGR array; boxes are multiplied by scale"""
         table_results = []
         try:
-            print(f"    - Running table OCR...")
+            logger.debug("Running table OCR")
             # Perform table recognition
-            table_results_raw = self.ocr_table.ocr(image_path)
+            table_results_raw = self.ocr_table.ocr(image)
             
             # Flatten the result structure for tables
             if table_results_raw and len(table_results_raw) > 0 and table_results_raw[0]:
+                items = []
                 for item in table_results_raw[0]:
                     try:
                         # PaddleOCR table results can have different formats.
                         # We're interested in the 'rec_res' which contains the HTML table structure.
                         if isinstance(item, dict) and 'rec_res' in item:
                             if isinstance(item['rec_res'], str) and '<table>' in item['rec_res']:
-                                # Extract table bounding box
+                                # Keep tables that have a bounding box
                                 if 'box' in item and len(item['box']) >= 4:
-                                    table_bbox = [
-                                        [int(p) for p in item['box'][0]],
-                                        [int(p) for p in item['box'][1]],
-                                        [int(p) for p in item['box'][2]],
-                                        [int(p) for p in item['box'][3]]
-                                    ]
-                                    table_html = item['rec_res']
-                                    table_results.append({
-                                        "bbox": table_bbox, 
-                                        "html": table_html
-                                    })
+                                    items.append(item)
                     except Exception as e:
                         print(f"    [WARNING] Failed to process table item: {e}")
                         continue
+
+                table_bboxes = int_bboxes([_scale_box(item['box'], scale) for item in items])
+                for item, table_bbox in zip(items, table_bboxes):
+                    if table_bbox is not None:
+                        table_results.append({
+                            "bbox": table_bbox, 
+                            "html": item['rec_res']
+                        })
                         
         except Exception as e:
             print(f"    [ERROR] Table OCR failed: {e}")
@@ -183,10 +227,43 @@ class OCRProcessor:
                 del self.ocr_text
             if hasattr(self, 'ocr_table'):
                 del self.ocr_table
+            if hasattr(self, '_table_executor'):
+                self._table_executor.shutdown(wait=False)
             gc.collect()
         except:
             pass
 
+def get_paddle_ocr(lang: str = "en", use_angle_cls: bool = True) -> PaddleOCR:
+    """
+    Returns a process-wide PaddleOCR text model for the given settings, loading
+    it on first use (see create_paddle_ocr).
+
+    On the GPU, one inference on a blank 640x640 image is run right after
+    loading, so kernel selection and memory allocation aren't paid by the
+    first real page.
+    """
+    # Positional, so get_paddle_ocr() and get_paddle_ocr(lang="en") share a model
+    return _load_paddle_ocr(lang, use_angle_cls)
+
+@lru_cache(maxsize=None)
+def _load_paddle_ocr(lang: str, use_angle_cls: bool) -> PaddleOCR:
+    ocr = create_paddle_ocr(use_angle_cls=use_angle_cls, lang=lang,
+                            rec_batch_num=OCR_CONFIG.get("rec_batch_size", 6))
+    if OCR_CONFIG.get("use_gpu", False):
+        ocr.ocr(np.full((640, 640, 3), 255, dtype=np.uint8))
+    return ocr
+
+@lru_cache(maxsize=1)
+def get_ocr_processor() -> OCRProcessor:
+    """
+    Returns the process-wide OCRProcessor, loading the PaddleOCR models on first use.
+
+    The text and table models take seconds to load, so repeated conversions in
+    one process (e.g. a script converting many PDFs) share them instead of
+    reloading them for every document.
+    """
+    return OCRProcessor()
+
 if __name__ == '__main__':
     # Example usage
     # You need a sample image with handwritten text and a table for good testing.
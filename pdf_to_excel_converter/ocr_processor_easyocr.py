@@ -3,23 +3,48 @@
 OCR processor using EasyOCR instead of PaddleOCR for better stability on macOS.
 """
 
+import io
 import os
 import gc
+import time
 import logging
+import multiprocessing
+import contextlib
 import traceback
 import easyocr
+import numpy as np
 from PIL import Image
-from typing import List, Dict, Any, Tuple, Optional
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Optional, Iterable, Iterator, Union
 
-from config import OCR_CONFIG
+from config import OCR_CONFIG, RETRY_DPI, TEMP_IMAGE_DIR, TEMP_IMAGE_EXTENSION
+from bbox_utils import int_bbox_array, suppress_overlapping
+from page_image import PageImage, page_name, page_scale, image_size, ocr_input, downscale
+from progress import PageProgress
+from text_results import TextResults, mean_confidence
+from pdf_processor import render_page
+from ocr_cache import page_digest, load_page_results, save_page_results
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# Per-page details are logged at DEBUG; raise this module's level to see them
+logger.setLevel(logging.INFO)
 
 class OCRProcessor:
-    def __init__(self):
+    def __init__(self, use_gpu: Optional[bool] = None):
         self.reader = None
+        self.use_gpu = OCR_CONFIG.get("use_gpu", False) if use_gpu is None else use_gpu
+        # Text crops recognized per forward pass (EasyOCR reads them one by one by default)
+        self.rec_batch_size = OCR_CONFIG.get("rec_batch_size", 1)
+        # Runs the tiles of a large page side by side; torch releases the GIL during inference
+        self._tile_executor = None
+        if OCR_CONFIG.get("tile_large_pages", False):
+            rows, cols = OCR_CONFIG.get("tile_grid", (2, 2))
+            self._tile_executor = ThreadPoolExecutor(max_workers=rows * cols, thread_name_prefix="ocr-tile")
         self._initialize_ocr()
 
     def _initialize_ocr(self):
@@ -28,7 +53,9 @@ class OCRProcessor:
             print("[*] Initializing EasyOCR...")
             # Initialize EasyOCR reader
             # EasyOCR supports many languages, 'en' for English
-            self.reader = easyocr.Reader(['en'], gpu=OCR_CONFIG.get("use_gpu", False))
+            # On GPU, let cuDNN pick the fastest kernels for the (fixed) page size
+            gpu_options = {'cudnn_benchmark': True} if self.use_gpu else {}
+            self.reader = easyocr.Reader(['en'], gpu=self.use_gpu, **gpu_options)
             print("[*] EasyOCR initialized successfully")
             
         except Exception as e:
@@ -36,7 +63,8 @@ class OCRProcessor:
             print(f"[ERROR] Traceback: {traceback.format_exc()}")
             raise
 
-    def process_image(self, image_path: str) -> Tuple[List[Dict], List[Dict]]:
+    def process_image(self, image_path: Union[str, PageImage],
+                      full_resolution: bool = False) -> Tuple[TextResults, List[Dict]]:
         """
         Performs text recognition on a given image using EasyOCR.
         
@@ -44,91 +72,547 @@ class OCRProcessor:
         so we'll focus on text extraction and return empty table results.
 
         Args:
-            image_path (str): The path to the input image file.
+            image_path (Union[str, PageImage]): The path to the input image file, or a page rendered in memory.
+            full_resolution (bool): Read the page as it is instead of shrinking it to
+                OCR_CONFIG['ocr_max_side'] first (used when retrying a poorly read page).
 
         Returns:
-            Tuple[List[Dict], List[Dict]]: A tuple containing:
-                - List of text detection/recognition results (each dict has 'bbox' and 'text').
+            Tuple[TextResults, List[Dict]]: A tuple containing:
+                - The text detection/recognition results (indexing gives dicts with 'bbox', 'text' and 'confidence').
                 - List of table detection/structure results (empty for EasyOCR).
         """
-        print(f"[*] Processing image for OCR: {os.path.basename(image_path)}")
+        logger.debug("Processing image for OCR: %s", page_name(image_path))
         
         # Validate input
-        if not os.path.exists(image_path):
+        if not isinstance(image_path, PageImage) and not os.path.exists(image_path):
             print(f"[ERROR] Image file not found: {image_path}")
-            return [], []
+            return TextResults.empty(), []
         
-        text_results = []
+        text_results = TextResults.empty()
         table_results = []  # EasyOCR doesn't do table structure recognition
         
         try:
+            # Hand EasyOCR the page's pixels (image files are decoded here)
+            image = ocr_input(image_path)
             # Process text OCR with error handling
-            text_results = self._process_text_ocr(image_path)
-            
-            # Force garbage collection to free memory
-            gc.collect()
+            max_side = None if full_resolution else OCR_CONFIG.get("ocr_max_side")
+            text_results = self._process_text_ocr(image, page_scale(image_path), max_side)
             
         except Exception as e:
-            print(f"[ERROR] OCR processing failed for {image_path}: {e}")
+            print(f"[ERROR] OCR processing failed for {page_name(image_path)}: {e}")
             print(f"[ERROR] Traceback: {traceback.format_exc()}")
             # Return empty results instead of crashing
-            return [], []
+            return TextResults.empty(), []
 
-        print(f"    - Found {len(text_results)} text elements.")
-        print(f"    - Found {len(table_results)} tables (table detection not supported by EasyOCR).")
+        logger.debug("Found %d text elements and %d tables (table detection not supported by EasyOCR)",
+                     len(text_results), len(table_results))
         return text_results, table_results
 
-    def _process_text_ocr(self, image_path: str) -> List[Dict]:
-        """Process text OCR with EasyOCR"""
-        text_results = []
+    def process_images(self, image_paths: List[Union[str, PageImage]]) -> List[Tuple[TextResults, List[Dict]]]:
+        """
+        Performs text recognition on several equally sized images with one batched
+        EasyOCR call, so the detector runs a single batched forward pass.
+
+        Falls back to process_image for each image if the batched call fails.
+
+        Args:
+            image_paths (List[Union[str, PageImage]]): Images (paths or in-memory pages) that all have the same size.
+
+        Returns:
+            List[Tuple[TextResults, List[Dict]]]: One (text_results, table_results) tuple per image, in order.
+        """
+        if len(image_paths) == 1:
+            return [self.process_image(image_paths[0])]
+
+        logger.debug("Processing %d images for OCR in one batch", len(image_paths))
         try:
-            print(f"    - Running text OCR with EasyOCR...")
-            
-            # Read text from image
-            results = self.reader.readtext(image_path)
+            # Pages in a batch share a size, so they are all scaled alike
+            images, factors = zip(*(downscale(ocr_input(image_path), OCR_CONFIG.get("ocr_max_side"))
+                                    for image_path in image_paths))
+            scales = [page_scale(image_path) for image_path in image_paths]
+            batched_results = [self._rescale_results(results, (fx * scale, fy * scale))
+                               for results, (fx, fy), scale
+                               in zip(self.reader.readtext_batched(list(images), batch_size=self.rec_batch_size),
+                                      factors, scales)]
+        except Exception as e:
+            print(f"    [WARNING] Batched OCR failed, processing images one by one: {e}")
+            return [self.process_image(image_path) for image_path in image_paths]
+
+        page_results = []
+        for image_path, results in zip(image_paths, batched_results):
+            text_results = self._convert_results(results)
+            logger.debug("%s: found %d text elements", page_name(image_path), len(text_results))
+            page_results.append((text_results, []))  # EasyOCR doesn't do table structure recognition
+        return page_results
+
+    def _process_text_ocr(self, image: Union[str, np.ndarray], scale: float = 1.0,
+                          max_side: Optional[int] = None) -> TextResults:
+        """
+        Process text OCR with EasyOCR on an image path or decoded BGR array, shrunk
+        to max_side first; boxes are multiplied by scale (see page_scale)
+        """
+        text_results = TextResults.empty()
+        try:
+            logger.debug("Running text OCR with EasyOCR")
             
-            # Convert EasyOCR results to our format
-            for result in results:
-                try:
-                    if len(result) >= 3:
-                        # EasyOCR returns: (bbox, text, confidence)
-                        bbox_coords = result[0]  # List of 4 coordinate pairs
-                        text = result[1]
-                        confidence = result[2]
-                        
-                        # Convert bbox format to match our expected format
-                        # EasyOCR bbox is [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                        bbox = [
-                            [int(coord) for coord in bbox_coords[0]],  # top-left
-                            [int(coord) for coord in bbox_coords[1]],  # top-right
-                            [int(coord) for coord in bbox_coords[2]],  # bottom-right
-                            [int(coord) for coord in bbox_coords[3]]   # bottom-left
-                        ]
-                        
-                        text_results.append({
-                            "bbox": bbox,
-                            "text": text,
-                            "confidence": confidence
-                        })
-                        
-                except Exception as e:
-                    print(f"    [WARNING] Failed to process text result: {e}")
-                    continue
+            # Read text from image; very large pages are split into tiles read in parallel
+            if self._should_tile(image):
+                results = self._ocr_tiled(image, OCR_CONFIG.get("tile_grid", (2, 2)),
+                                          OCR_CONFIG.get("tile_overlap", 128))
+                results = self._rescale_results(results, (scale, scale))
+            else:
+                # Detection runs at most at EasyOCR's canvas size anyway; shrinking the page
+                # here once also makes the recognizer's crops smaller
+                small, (fx, fy) = downscale(image, max_side)
+                results = self._rescale_results(self.reader.readtext(small, batch_size=self.rec_batch_size),
+                                                (fx * scale, fy * scale))
+            text_results = self._convert_results(results)
                     
         except Exception as e:
             print(f"    [ERROR] Text OCR failed: {e}")
             
         return text_results
 
+    def _should_tile(self, image: Union[str, np.ndarray]) -> bool:
+        """Whether a page is large enough to be read in tiles (only decoded pages are tiled)"""
+        return (self._tile_executor is not None and isinstance(image, np.ndarray) and
+                max(image.shape[:2]) > OCR_CONFIG.get("tile_min_size", 4000))
+
+    def _ocr_tiled(self, img: np.ndarray, tiles: Tuple[int, int] = (2, 2), overlap: int = 64) -> List:
+        """
+        Runs EasyOCR on a grid of overlapping tiles of the page in parallel.
+
+        Each tile's boxes are shifted back to page coordinates. Text in an
+        overlap is found by both tiles, whole or cut off at a tile's edge, so of
+        boxes that overlap by more than half (of the smaller one), one is kept:
+        preferably one not touching an inner tile edge, then the most confident.
+
+        Args:
+            img (np.ndarray): The decoded page.
+            tiles (Tuple[int, int]): Number of tile rows and columns.
+            overlap (int): Pixels each tile extends past its share of the page on every inner side.
+
+        Returns:
+            List: EasyOCR-style (bbox, text, confidence) results for the whole page.
+        """
+        height, width = img.shape[:2]
+        rows, cols = tiles
+        futures = []
+        for r in range(rows):
+            y0 = max(0, r * height // rows - overlap)
+            y1 = min(height, (r + 1) * height // rows + overlap)
+            for c in range(cols):
+                x0 = max(0, c * width // cols - overlap)
+                x1 = min(width, (c + 1) * width // cols + overlap)
+                tile = img[y0:y1, x0:x1]
+                futures.append((x0, y0, x1, y1, self._tile_executor.submit(self.reader.readtext, tile,
+                                                                    batch_size=self.rec_batch_size)))
+
+        results, priorities = [], []
+        for x0, y0, x1, y1, future in futures:
+            # Edges shared with a neighbouring tile, where text may have been cut off
+            inner = (x0 > 0, y0 > 0, x1 < width, y1 < height)
+            for result in future.result():
+                if len(result) < 3:
+                    continue
+                xs = [point[0] for point in result[0]]
+                ys = [point[1] for point in result[0]]
+                cut = ((inner[0] and min(xs) <= 1) or (inner[1] and min(ys) <= 1) or
+                       (inner[2] and max(xs) >= x1 - x0 - 1) or (inner[3] and max(ys) >= y1 - y0 - 1))
+                bbox = [[x + x0, y + y0] for x, y in zip(xs, ys)]
+                results.append((bbox, result[1], result[2]))
+                # Confidences are in [0, 1], so any whole box outranks any cut one
+                priorities.append(result[2] + (0.0 if cut else 1.0))
+
+        keep = suppress_overlapping([result[0] for result in results], priorities, overlap_threshold=0.5)
+        return [results[i] for i in keep]
+
+    @staticmethod
+    def _rescale_results(results: List, factor: Tuple[float, float]) -> List:
+        """Maps the boxes of results read from a shrunk page back to the full page by the (x, y) factor"""
+        fx, fy = factor
+        if fx == 1.0 and fy == 1.0:
+            return results
+        return [([[x * fx, y * fy] for x, y in result[0]], *result[1:])
+                for result in results if len(result) >= 3]
+
+    @staticmethod
+    def _convert_results(results: List) -> TextResults:
+        """Convert EasyOCR results to our format"""
+        # EasyOCR returns: (bbox, text, confidence)
+        results = [result for result in results if len(result) >= 3]
+        # EasyOCR bbox is [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]; cast the whole page at once
+        bboxes, valid = int_bbox_array([result[0] for result in results])
+        keep = np.flatnonzero(valid).tolist()
+        return TextResults(
+            bboxes[valid],
+            [results[i][1] for i in keep],
+            np.array([results[i][2] for i in keep], dtype=np.float64)
+        )
+
     def __del__(self):
         """Cleanup method to ensure proper resource deallocation"""
         try:
             if hasattr(self, 'reader'):
                 del self.reader
+            if getattr(self, '_tile_executor', None) is not None:
+                self._tile_executor.shutdown(wait=False)
             gc.collect()
         except:
             pass
 
+@lru_cache(maxsize=None)
+def get_ocr_processor(use_gpu: Optional[bool] = None) -> OCRProcessor:
+    """
+    Returns the process-wide OCRProcessor, loading the EasyOCR models on first use.
+
+    Loading a reader takes seconds, so repeated conversions in one process
+    (e.g. a script converting many PDFs) share it instead of reloading it.
+    """
+    return OCRProcessor(use_gpu=use_gpu)
+
+# EasyOCR reader owned by each page worker process
+_WORKER_OCR = None
+
+# Page worker pool, kept across documents so its workers load their reader only once
+_OCR_POOL: Optional[ProcessPoolExecutor] = None
+_OCR_POOL_WORKERS = 0
+
+def _init_ocr_worker():
+    """Process pool initializer: load one CPU reader per worker"""
+    global _WORKER_OCR
+    try:
+        # Workers already run in parallel; one torch thread each avoids oversubscribing the cores
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+    with contextlib.redirect_stdout(io.StringIO()):
+        _WORKER_OCR = get_ocr_processor(use_gpu=False)
+
+def _get_ocr_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Returns the shared page worker pool, replacing it if it has fewer than workers processes.
+
+    Workers are spawned rather than forked: the pool is started on the OCR
+    pipeline thread while the renderer thread is running, in a process that
+    has already imported torch, and forking a process with live threads can
+    deadlock the child.
+    """
+    global _OCR_POOL, _OCR_POOL_WORKERS
+    if _OCR_POOL is None or _OCR_POOL_WORKERS < workers:
+        _discard_ocr_pool()
+        _OCR_POOL = ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        _OCR_POOL_WORKERS = workers
+        # Workers only start on demand; ping each one now so their readers load
+        # while the first page is still being rendered
+        for _ in range(workers):
+            _OCR_POOL.submit(_ping_worker)
+    return _OCR_POOL
+
+def _discard_ocr_pool():
+    """Shuts down the shared page worker pool so the next document starts a fresh one"""
+    global _OCR_POOL, _OCR_POOL_WORKERS
+    if _OCR_POOL is not None:
+        _OCR_POOL.shutdown(wait=False, cancel_futures=True)
+    _OCR_POOL = None
+    _OCR_POOL_WORKERS = 0
+
+def preload_ocr_models(max_workers: Optional[int] = None):
+    """
+    Loads every reader ocr_images() may use: the in-process one and, on CPU,
+    the worker pool. Meant for long-running processes (e.g. the conversion
+    daemon) so that even their first document doesn't wait for the models.
+    """
+    get_ocr_processor()
+    if not OCR_CONFIG.get("use_gpu", False):
+        _get_ocr_pool(max_workers or os.cpu_count() or 1)
+
+def _ping_worker():
+    """No-op task used to start a worker (and load its reader) ahead of the first page"""
+    return None
+
+def _ocr_worker(image_path: Union[str, PageImage], full_resolution: bool = False) -> Tuple[str, Tuple[TextResults, List[Dict]]]:
+    """Run OCR on one page in a worker; returns the captured log and the results"""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        results = _WORKER_OCR.process_image(image_path, full_resolution=full_resolution)
+    return out.getvalue(), results
+
+class _RateLimiter:
+    """Token bucket handing out pages at rate per second, allowing bursts of up to one second's worth"""
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+
+    def acquire(self, n: int = 1):
+        """Blocks until n pages may be handed out"""
+        n = min(n, self.capacity)
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return
+            time.sleep((n - self.tokens) / self.rate)
+
+def add_ocr_limit_arguments(parser):
+    """Adds the --max-concurrency and --rate options to a command line parser"""
+    parser.add_argument("--max-concurrency", type=int, default=None, metavar="N",
+                        help="Most pages queued for OCR at once (default: twice the worker count)")
+    parser.add_argument("--rate", type=float, default=None, metavar="PAGES_PER_SEC",
+                        help="Most pages handed to OCR per second (default: unlimited)")
+
+def apply_ocr_limits(args):
+    """Stores the limits parsed by add_ocr_limit_arguments() in OCR_CONFIG"""
+    if args.max_concurrency is not None:
+        OCR_CONFIG["max_pages_in_flight"] = max(1, args.max_concurrency)
+    if args.rate is not None and args.rate > 0:
+        OCR_CONFIG["max_pages_per_second"] = args.rate
+
+def _page_id(image_path: Union[str, PageImage]) -> str:
+    """The path of an image file, or the name of an in-memory page"""
+    return image_path.name if isinstance(image_path, PageImage) else image_path
+
+def _same_size_batches(image_paths: Iterable[Union[str, PageImage]], batch_size: int) -> Iterator[List[Union[str, PageImage]]]:
+    """
+    Split pages into runs of consecutive, equally sized images of at most batch_size each.
+
+    Works on a stream: a batch is emitted once it is full, the next page has a
+    different size, or the pages run out.
+    """
+    batch = []
+    last_size = None
+    for img_path in image_paths:
+        try:
+            # Only reads the image header of files
+            size = image_size(img_path)
+        except Exception:
+            size = None  # Unreadable: keep it on its own so process_image reports the error
+        if batch and size is not None and size == last_size and len(batch) < batch_size:
+            batch.append(img_path)
+        else:
+            if batch:
+                yield batch
+            batch = [img_path]
+        last_size = size
+    if batch:
+        yield batch
+
+def _cached_page(image_path: Union[str, PageImage], use_cache: bool) -> Tuple[Optional[str], Optional[Tuple]]:
+    """A page's cache key and its cached results (either may be None, e.g. with use_cache off)"""
+    if not use_cache:
+        return None, None
+    try:
+        digest = page_digest(image_path)
+    except OSError:
+        return None, None  # Unreadable: process_image reports the error
+    return digest, load_page_results(digest)
+
+def ocr_images(image_paths: Iterable[Union[str, PageImage]], max_workers: Optional[int] = None,
+               total: Optional[int] = None, use_cache: bool = True) -> Iterator[Tuple[str, Optional[Tuple[TextResults, List[Dict]]], Optional[Exception]]]:
+    """
+    Runs OCR on every page, yielding (image_path, (text_results, table_results), error) in page order.
+    Pages rendered in memory are reported by name in place of image_path.
+    Progress (a tqdm bar when tqdm is installed) and any errors logged by a
+    page are printed in page order too.
+
+    Pages are spread over a process pool with one CPU reader per worker. With
+    the GPU enabled (or a single page) everything runs on one in-process reader
+    instead, since several processes contending for one GPU is slower; on the
+    GPU, runs of equally sized pages are sent through the reader in batches.
+    A reader that fails to initialize raises instead of yielding per-page errors.
+    Readers and worker processes are kept for later calls, so only the first
+    document pays for loading the models, and that loading starts right away,
+    overlapping the rendering of the first pages.
+
+    image_paths may be a stream (e.g. pages still being rendered): each page is
+    started as soon as it arrives, and pass total so the page count is known up front.
+    At most OCR_CONFIG['max_pages_in_flight'] pages wait in the worker pool at a
+    time (a page is collected before another is submitted), and pages are
+    handed out no faster than OCR_CONFIG['max_pages_per_second'] if set.
+
+    Pages whose image was read before with the same settings (see
+    ocr_cache.page_digest) get their cached results instead of going to OCR.
+
+    Args:
+        image_paths (Iterable[Union[str, PageImage]]): The page images to process, as files or in-memory pages.
+        max_workers (Optional[int]): Worker processes to use (default: one per CPU).
+        total (Optional[int]): Number of pages, required when image_paths has no len().
+        use_cache (bool): Whether to reuse and store per-page results.
+    """
+    if total is None:
+        image_paths = list(image_paths)
+        total = len(image_paths)
+
+    use_gpu = OCR_CONFIG.get("use_gpu", False)
+    if total <= 1 or use_gpu:
+        # Load the reader on a helper thread while the first pages are rendered
+        with ThreadPoolExecutor(max_workers=1) as loader:
+            reader_future = loader.submit(get_ocr_processor)
+            # On GPU, equally sized consecutive pages go through the reader as one batch
+            if use_gpu:
+                batches = _same_size_batches(image_paths, OCR_CONFIG.get("gpu_batch_size", 8))
+            else:
+                batches = ([img_path] for img_path in image_paths)
+            rate = OCR_CONFIG.get("max_pages_per_second")
+            limiter = _RateLimiter(rate) if rate else None
+            progress = PageProgress(total)
+            try:
+                for batch in batches:
+                    digests, cached = zip(*(_cached_page(img_path, use_cache) for img_path in batch))
+                    # Only the pages without cached results go to the reader
+                    todo = [img_path for img_path, results in zip(batch, cached) if results is None]
+                    batch_results, error = [], None
+                    if todo:
+                        ocr_processor = reader_future.result()
+                        if limiter is not None:
+                            limiter.acquire(len(todo))
+                        try:
+                            batch_results = ocr_processor.process_images(todo)
+                        except Exception as e:
+                            error = e
+                    new_results = iter(batch_results)
+                    for img_path, digest, results in zip(batch, digests, cached):
+                        progress.update(page_name(img_path))
+                        if results is None:
+                            if error is not None:
+                                yield _page_id(img_path), None, error
+                                continue
+                            results = next(new_results)
+                            if digest is not None:
+                                save_page_results(digest, results)
+                        yield _page_id(img_path), results, None
+            finally:
+                progress.close()
+        return
+
+    workers = max_workers or min(total, os.cpu_count() or 1)
+
+    def collect(img_path, future, digest):
+        progress.update(page_name(img_path))
+        try:
+            log, results = future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            return _page_id(img_path), None, e
+        print(log, end='')
+        if digest is not None:
+            save_page_results(digest, results)
+        return _page_id(img_path), results, None
+
+    executor = _get_ocr_pool(workers)
+    print(f"[*] Running OCR on {total} pages with {_OCR_POOL_WORKERS} worker processes...")
+    # Pages the workers don't get to yet wait in the pool's queue (pickled, pixels and
+    # all); past the limit, wait for the oldest page before submitting another
+    max_in_flight = OCR_CONFIG.get("max_pages_in_flight") or 2 * _OCR_POOL_WORKERS
+    rate = OCR_CONFIG.get("max_pages_per_second")
+    limiter = _RateLimiter(rate) if rate else None
+    # Submit pages as they arrive and hand back finished ones in order as we go
+    pending = deque()
+    progress = PageProgress(total)
+    try:
+        for img_path in image_paths:
+            digest, cached = _cached_page(img_path, use_cache)
+            if cached is not None:
+                # Queued like an OCR'd page so pages still come out in order
+                future = Future()
+                future.set_result(("", cached))
+                pending.append((_page_id(img_path), future, None))
+            else:
+                while len(pending) >= max_in_flight:
+                    yield collect(*pending.popleft())
+                if limiter is not None:
+                    limiter.acquire()
+                future = executor.submit(_ocr_worker, img_path)
+                # Keep only the name of in-memory pages; the pixels now live in the worker
+                pending.append((_page_id(img_path), future, digest))
+            while pending and pending[0][1].done():
+                yield collect(*pending.popleft())
+        while pending:
+            yield collect(*pending.popleft())
+    except BrokenProcessPool:
+        # A worker died (or its reader failed to load); start over with a new pool next time
+        _discard_ocr_pool()
+        raise
+    finally:
+        progress.close()
+        # The pool outlives this document; don't leave its pages queued if we stop early
+        for _, future, _ in pending:
+            future.cancel()
+
+def _read_again(page: PageImage) -> Future:
+    """
+    Reads a page at full resolution with the reader ocr_images() used: the
+    worker pool when there is one (the read runs there while later pages
+    keep arriving), otherwise the in-process reader.
+    """
+    if _OCR_POOL is not None:
+        return _OCR_POOL.submit(_ocr_worker, page, True)
+    future = Future()
+    try:
+        future.set_result(("", get_ocr_processor().process_image(page, full_resolution=True)))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def retry_low_confidence(page_results: Iterable[Tuple[str, Optional[Tuple[TextResults, List[Dict]]], Optional[Exception]]],
+                         pdf_path: str) -> Iterator[Tuple[str, Optional[Tuple[TextResults, List[Dict]]], Optional[Exception]]]:
+    """
+    Passes on what ocr_images() yields for the pages of a PDF, reading again
+    each page whose mean text confidence is below OCR_CONFIG['retry_confidence']:
+    the page is rendered at RETRY_DPI and read at full resolution (see
+    _read_again), and whichever reading scores higher is kept. Pages are
+    still passed on in order; a retried page holds back the ones after it
+    until its second reading is in, at most OCR_CONFIG['max_pages_in_flight']
+    pages at a time.
+
+    Args:
+        page_results: The (page name, results, error) tuples from ocr_images()
+            for pages rendered by iter_pdf_pages(), i.e. named "page_<n>".
+        pdf_path (str): The PDF the pages were rendered from.
+    """
+    threshold = OCR_CONFIG.get("retry_confidence")
+    max_in_flight = OCR_CONFIG.get("max_pages_in_flight") or 2 * max(_OCR_POOL_WORKERS, 1)
+    pending = deque()
+
+    def finish(page_id, results, error, confidence, retry):
+        if retry is not None:
+            try:
+                log, retried = retry.result()
+                print(log, end='')
+                if (mean_confidence(retried[0]) or 0.0) > confidence:
+                    results = retried
+            except Exception as e:
+                print(f"    [WARNING] Could not read {page_id} again: {e}")
+        return page_id, results, error
+
+    try:
+        for page_id, results, error in page_results:
+            confidence = mean_confidence(results[0]) if results is not None else None
+            retry = None
+            if threshold is not None and confidence is not None and confidence < threshold:
+                print(f"    [*] {page_id}: mean confidence {confidence:.2f}, reading it again at {RETRY_DPI} DPI")
+                try:
+                    retry = _read_again(render_page(pdf_path, int(page_id.rsplit("_", 1)[1]), RETRY_DPI))
+                except Exception as e:
+                    print(f"    [WARNING] Could not read {page_id} again: {e}")
+            pending.append((page_id, results, error, confidence, retry))
+            while pending and (len(pending) > max_in_flight or pending[0][4] is None or pending[0][4].done()):
+                yield finish(*pending.popleft())
+        while pending:
+            yield finish(*pending.popleft())
+    finally:
+        # Don't leave second readings queued in the shared pool if we stop early
+        for *_, retry in pending:
+            if retry is not None:
+                retry.cancel()
+
 def test_easyocr():
     """Test function for EasyOCR"""
     print("Testing EasyOCR setup...")
@@ -137,7 +621,7 @@ def test_easyocr():
         ocr_processor = OCRProcessor()
         
         # Check if we have an image to test with
-        image_path = "temp_images/page_1.png"
+        image_path = os.path.join(TEMP_IMAGE_DIR, f"page_1.{TEMP_IMAGE_EXTENSION}")
         if not os.path.exists(image_path):
             print(f"Test image not found: {image_path}")
             return False
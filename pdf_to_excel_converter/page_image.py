@@ -0,0 +1,69 @@
+# In-memory page images and the helpers the OCR processors share # page_image.py
+import os
+from typing import NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2  # Installed along with EasyOCR and PaddleOCR
+except ImportError:
+    cv2 = None
+
+class PageImage(NamedTuple):
+    """A rendered page kept in memory instead of a temporary image file"""
+    name: str           # e.g. "page_3", used in logs and reports
+    pixels: np.ndarray  # BGR (or single-channel) uint8 array
+    scale: float = 1.0  # Factor from these pixels to COORDINATE_DPI, which OCR boxes are reported in
+
+def page_name(image: Union[str, PageImage]) -> str:
+    """Display name of a page given either as an image path or a PageImage"""
+    return image.name if isinstance(image, PageImage) else os.path.basename(image)
+
+def page_scale(image: Union[str, PageImage]) -> float:
+    """Factor mapping a page's pixel coordinates to COORDINATE_DPI (1.0 for image files)"""
+    return image.scale if isinstance(image, PageImage) else 1.0
+
+def image_size(image: Union[str, PageImage]) -> Tuple[int, int]:
+    """(width, height) of a page, reading only the header for image files"""
+    if isinstance(image, PageImage):
+        return image.pixels.shape[1], image.pixels.shape[0]
+    with Image.open(image) as img:
+        return img.size
+
+def downscale(image: Union[str, np.ndarray], max_side: Optional[int]) -> Tuple[Union[str, np.ndarray], Tuple[float, float]]:
+    """
+    Shrinks a decoded page so its long edge is at most max_side pixels, using
+    area interpolation (which averages rather than skips pixels).
+
+    Returns:
+        Tuple[Union[str, np.ndarray], Tuple[float, float]]: The page and the
+        (x, y) factors mapping its coordinates back to the original, which are
+        (1.0, 1.0) for paths, pages already small enough, when max_side is
+        None or when OpenCV is not available.
+    """
+    if max_side is None or cv2 is None or not isinstance(image, np.ndarray):
+        return image, (1.0, 1.0)
+    height, width = image.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1.0:
+        return image, (1.0, 1.0)
+    small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    # Per axis, from the rounded sizes, so boxes map back exactly
+    return small, (width / small.shape[1], height / small.shape[0])
+
+def ocr_input(image: Union[str, PageImage]) -> Union[np.ndarray, str]:
+    """
+    What to hand an OCR engine for a page: the pixels of an in-memory page, or
+    an image file decoded once into a BGR array, so an engine making several
+    passes over the page doesn't decode it for each one.
+
+    Returns the path itself when OpenCV is not available or can't read the
+    file, so the engine falls back to loading it on its own.
+    """
+    if isinstance(image, PageImage):
+        return image.pixels
+    if cv2 is None:
+        return image
+    pixels = cv2.imread(image)
+    return image if pixels is None else pixels
@@ -1,14 +1,108 @@
 # Functions for processing PDFs # pdf_processor.py
 import os
-from pdf2image import convert_from_path
-from PIL import Image
+import tempfile
+import multiprocessing
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from typing import Iterator, List, Optional, Set
+from pdf2image import convert_from_path, pdfinfo_from_path
 
-from config import TEMP_IMAGE_DIR, POPPLER_PATH
+try:
+    import pymupdf  # Optional: renders in-process, without a pdftoppm process per call
+except ImportError:
+    pymupdf = None
+
+from config import (TEMP_IMAGE_DIR, TEMP_IMAGE_FORMAT, TEMP_IMAGE_QUALITY, TEMP_IMAGE_EXTENSION, DEBUG_SAVE_IMAGES,
+                    POPPLER_PATH, RENDER_DPI, RENDER_GRAYSCALE, RENDER_THREADS, COORDINATE_DPI)
+from page_image import PageImage, cv2
+
+# Pages rendered per pdftoppm call by iter_pdf_pages: every call starts a new
+# process that parses the whole document, while each page in a chunk is held
+# in memory until the chunk has been yielded. A chunk is never smaller than
+# RENDER_THREADS, so every render thread gets a page
+RENDER_CHUNK_PAGES = 4
+
+# Which library renders the pages; recorded with cached OCR results, since the
+# two rasterize slightly differently
+RENDERER = "pymupdf" if pymupdf is not None else "pdftoppm"
+
+# PyMuPDF render worker pool, started on first use and kept for every later document
+_RENDER_POOL: Optional[ProcessPoolExecutor] = None
+
+def _get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Returns the shared PyMuPDF render pool, or None if RENDER_THREADS is 1 and
+    pages are rendered in this process.
+
+    Workers are spawned rather than forked: documents are rendered while the
+    OCR and mapping pipeline threads are running, and forking a process with
+    live threads can deadlock the child.
+    """
+    global _RENDER_POOL
+    if RENDER_THREADS <= 1:
+        return None
+    if _RENDER_POOL is None:
+        _RENDER_POOL = ProcessPoolExecutor(max_workers=RENDER_THREADS,
+                                           mp_context=multiprocessing.get_context("spawn"))
+    return _RENDER_POOL
+
+def _pixmap(page, dpi: int = RENDER_DPI):
+    """Renders a PyMuPDF page, in grayscale if RENDER_GRAYSCALE is set"""
+    return page.get_pixmap(dpi=dpi, colorspace=pymupdf.csGRAY if RENDER_GRAYSCALE else pymupdf.csRGB)
+
+def _page_pixels(page, dpi: int = RENDER_DPI) -> np.ndarray:
+    """Renders a PyMuPDF page as a BGR (or, in grayscale, single-channel) array"""
+    pix = _pixmap(page, dpi)
+    if pix.n == 1:
+        return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width).copy()
+    pixels = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    # MuPDF renders RGB; the OCR engines expect OpenCV's BGR order
+    return np.ascontiguousarray(pixels[:, :, ::-1])
+
+def _render_range(pdf_path: str, start: int, end: int) -> List[np.ndarray]:
+    """
+    Render worker: renders pages start..end-1 (0-based) as pixel arrays. Each
+    call opens its own document, as MuPDF documents can't be shared between
+    processes.
+    """
+    with pymupdf.open(pdf_path) as doc:
+        return [_page_pixels(doc[i]) for i in range(start, end)]
+
+def _write_file(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+def _save_range(pdf_path: str, start: int, end: int, output_dir: str) -> List[str]:
+    """
+    Render worker: saves pages start..end-1 (0-based) as page_<n> images in output_dir.
+
+    Each page is rendered and encoded here, while the file writes go to a
+    writer thread (which runs without the GIL while writing), so rendering the
+    next page overlaps writing the last one.
+    """
+    image_paths = []
+    with pymupdf.open(pdf_path) as doc, ThreadPoolExecutor(max_workers=1) as writer:
+        writes = []
+        for i in range(start, end):
+            img_path = os.path.join(output_dir, f"page_{i+1}.{TEMP_IMAGE_EXTENSION}")
+            # Only the encoded page outlives this iteration, not its pixmap
+            data = _pixmap(doc[i], COORDINATE_DPI).tobytes(output=TEMP_IMAGE_EXTENSION, jpg_quality=TEMP_IMAGE_QUALITY)
+            writes.append(writer.submit(_write_file, img_path, data))
+            image_paths.append(img_path)
+        for write in writes:
+            write.result()
+    return image_paths
 
 def process_pdf(pdf_path: str) -> list[str]:
     """
     Converts a PDF file into a list of high-resolution images, one per page.
 
+    The files are rendered at COORDINATE_DPI rather than RENDER_DPI: an image
+    file carries no scale (see page_scale), so OCR boxes read from it are
+    already in the coordinates the mappers expect.
+
     Args:
         pdf_path (str): The path to the input PDF file.
 
@@ -18,15 +112,183 @@ def process_pdf(pdf_path: str) -> list[str]:
     if not os.path.exists(TEMP_IMAGE_DIR):
         os.makedirs(TEMP_IMAGE_DIR)
 
-    images = convert_from_path(pdf_path, dpi=300, poppler_path=POPPLER_PATH)
+    if pymupdf is not None:
+        n_pages = count_pdf_pages(pdf_path)
+        pool = _get_render_pool()
+        if pool is None:
+            image_paths = _save_range(pdf_path, 0, n_pages, TEMP_IMAGE_DIR)
+        else:
+            # One contiguous range of pages per worker
+            bounds = np.linspace(0, n_pages, RENDER_THREADS + 1).astype(int).tolist()
+            image_paths = [path for paths in pool.map(_save_range, repeat(pdf_path), bounds[:-1],
+                                                      bounds[1:], repeat(TEMP_IMAGE_DIR))
+                           for path in paths]
+        print(f"[*] Converted {len(image_paths)} pages from '{pdf_path}' to images.")
+        return image_paths
+
+    # pdftoppm writes the images itself (no PIL decode and re-encode), spread over
+    # RENDER_THREADS processes; a scratch folder keeps its "<name>-<nn>.<ext>" files
+    # apart from earlier runs' pages until they are renamed
     image_paths = []
-    for i, image in enumerate(images):
-        img_path = os.path.join(TEMP_IMAGE_DIR, f"page_{i+1}.png")
-        image.save(img_path, "PNG")
-        image_paths.append(img_path)
-    print(f"[*] Converted {len(images)} pages from '{pdf_path}' to images.")
+    with tempfile.TemporaryDirectory(dir=TEMP_IMAGE_DIR) as render_dir:
+        rendered = convert_from_path(pdf_path, dpi=COORDINATE_DPI, poppler_path=POPPLER_PATH,
+                                     thread_count=RENDER_THREADS, output_folder=render_dir,
+                                     output_file="page", fmt=TEMP_IMAGE_FORMAT, grayscale=RENDER_GRAYSCALE,
+                                     jpegopt={"quality": TEMP_IMAGE_QUALITY}, paths_only=True)
+        # The page numbers are zero-padded to one width, so the paths sort in page order
+        for i, rendered_path in enumerate(sorted(rendered)):
+            img_path = os.path.join(TEMP_IMAGE_DIR, f"page_{i+1}.{TEMP_IMAGE_EXTENSION}")
+            os.replace(rendered_path, img_path)
+            image_paths.append(img_path)
+    print(f"[*] Converted {len(image_paths)} pages from '{pdf_path}' to images.")
     return image_paths
 
+def _bgr_pixels(image) -> np.ndarray:
+    """Converts a page rendered by pdf2image to a BGR (or, in grayscale, single-channel) uint8 array"""
+    pixels = np.asarray(image)
+    if pixels.ndim == 3:
+        # pdf2image renders RGB; the OCR engines expect OpenCV's BGR order
+        pixels = np.ascontiguousarray(pixels[:, :, ::-1])
+    return pixels
+
+def render_page(pdf_path: str, page_number: int, dpi: int = RENDER_DPI) -> PageImage:
+    """
+    Renders a single page, e.g. to read it again at a higher resolution.
+
+    Args:
+        pdf_path (str): The path to the input PDF file.
+        page_number (int): The page to render, starting at 1.
+        dpi (int): The resolution to render at.
+
+    Returns:
+        PageImage: The page, named "page_<n>" like the pages of iter_pdf_pages().
+    """
+    if pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            pixels = _page_pixels(doc[page_number - 1], dpi)
+    else:
+        image = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number,
+                                  grayscale=RENDER_GRAYSCALE, poppler_path=POPPLER_PATH)[0]
+        pixels = _bgr_pixels(image)
+    return PageImage(f"page_{page_number}", pixels, COORDINATE_DPI / dpi)
+
+def count_pdf_pages(pdf_path: str) -> int:
+    """Returns the number of pages in a PDF without rendering it"""
+    if pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            return doc.page_count
+    return int(pdfinfo_from_path(pdf_path, poppler_path=POPPLER_PATH)["Pages"])
+
+def scanned_pages(pdf_path: str) -> Optional[Set[int]]:
+    """
+    Finds the pages (numbered from 1) that look scanned: they hold an image but
+    no text layer. Born-digital pages render with axis-aligned text; scans may
+    be rotated, so only they need PaddleOCR's angle classifier.
+
+    Args:
+        pdf_path (str): The path to the PDF file.
+
+    Returns:
+        Optional[Set[int]]: The scanned page numbers, or None without PyMuPDF (pdftoppm
+            can't tell), in which case any page may be a scan.
+    """
+    if pymupdf is None:
+        return None
+    with pymupdf.open(pdf_path) as doc:
+        return {i for i, page in enumerate(doc, start=1) if page.get_images() and not page.get_text().strip()}
+
+def iter_pdf_pages(pdf_path: str, n_pages: Optional[int] = None) -> Iterator[PageImage]:
+    """
+    Renders a PDF a few pages at a time (RENDER_CHUNK_PAGES, spread over
+    RENDER_THREADS pdftoppm processes), yielding pages as each chunk is
+    rendered, so later stages can start on the first pages while the rest are
+    still rendering. With PyMuPDF installed, chunks are rendered by
+    RENDER_THREADS worker processes instead.
+
+    Pages stay in memory as BGR (or grayscale) arrays, which both OCR engines
+    take directly; nothing is written to TEMP_IMAGE_DIR, so there is no PNG to
+    encode, read back and decode again, and nothing to clean up afterwards
+    (unless DEBUG_SAVE_IMAGES is set).
+
+    Args:
+        pdf_path (str): The path to the input PDF file.
+        n_pages (Optional[int]): The page count if the caller already has it
+            from count_pdf_pages(), to save reading it again.
+
+    Yields:
+        PageImage: Each rendered page, named "page_<n>", in page order.
+    """
+    pages = (_iter_pymupdf_pages if pymupdf is not None else _iter_pdftoppm_pages)(pdf_path, n_pages)
+    if DEBUG_SAVE_IMAGES:
+        pages = _save_debug_copies(pages)
+    yield from pages
+
+def _save_debug_copies(pages: Iterator[PageImage]) -> Iterator[PageImage]:
+    """Passes pages through, writing each one to TEMP_IMAGE_DIR/debug first (see DEBUG_SAVE_IMAGES)"""
+    debug_dir = os.path.join(TEMP_IMAGE_DIR, "debug")
+    os.makedirs(debug_dir, exist_ok=True)
+    for page in pages:
+        if cv2 is not None:
+            cv2.imwrite(os.path.join(debug_dir, f"{page.name}.{TEMP_IMAGE_EXTENSION}"), page.pixels,
+                        [cv2.IMWRITE_JPEG_QUALITY, TEMP_IMAGE_QUALITY])
+        yield page
+
+def _iter_pdftoppm_pages(pdf_path: str, n_pages: Optional[int] = None) -> Iterator[PageImage]:
+    """iter_pdf_pages with pdftoppm, one call per chunk of pages"""
+    if n_pages is None:
+        n_pages = count_pdf_pages(pdf_path)
+    chunk_pages = max(RENDER_CHUNK_PAGES, RENDER_THREADS)
+    for first in range(1, n_pages + 1, chunk_pages):
+        last = min(first + chunk_pages - 1, n_pages)
+        images = convert_from_path(pdf_path, dpi=RENDER_DPI, first_page=first, last_page=last,
+                                   grayscale=RENDER_GRAYSCALE, poppler_path=POPPLER_PATH,
+                                   thread_count=RENDER_THREADS)
+        for page, image in enumerate(images, start=first):
+            pixels = _bgr_pixels(image)
+            # Drop the PIL copy of the page as soon as it has been converted
+            images[page - first] = None
+            yield PageImage(f"page_{page}", pixels, COORDINATE_DPI / RENDER_DPI)
+    print(f"[*] Converted {n_pages} pages from '{pdf_path}' to images.")
+
+def _iter_pymupdf_pages(pdf_path: str, n_pages: Optional[int] = None) -> Iterator[PageImage]:
+    """
+    iter_pdf_pages with PyMuPDF. Chunks of RENDER_CHUNK_PAGES pages are
+    rendered by the worker pool, at most one chunk per worker ahead of the
+    page being yielded, so memory stays bounded on long documents.
+    """
+    pool = _get_render_pool()
+    if pool is None:
+        with pymupdf.open(pdf_path) as doc:
+            for i, page in enumerate(doc):
+                yield PageImage(f"page_{i+1}", _page_pixels(page), COORDINATE_DPI / RENDER_DPI)
+            print(f"[*] Converted {doc.page_count} pages from '{pdf_path}' to images.")
+        return
+
+    if n_pages is None:
+        n_pages = count_pdf_pages(pdf_path)
+    chunks = iter(range(0, n_pages, RENDER_CHUNK_PAGES))
+    pending = deque()
+
+    def submit_next():
+        start = next(chunks, None)
+        if start is not None:
+            end = min(start + RENDER_CHUNK_PAGES, n_pages)
+            pending.append((start, pool.submit(_render_range, pdf_path, start, end)))
+
+    try:
+        for _ in range(RENDER_THREADS):
+            submit_next()
+        while pending:
+            start, future = pending.popleft()
+            submit_next()
+            for i, pixels in enumerate(future.result(), start=start + 1):
+                yield PageImage(f"page_{i}", pixels, COORDINATE_DPI / RENDER_DPI)
+    finally:
+        # The consumer stopped early (or a chunk failed): don't render the rest
+        for _, future in pending:
+            future.cancel()
+    print(f"[*] Converted {n_pages} pages from '{pdf_path}' to images.")
+
 if __name__ == '__main__':
     # Example usage (for testing this module independently)
     # Create a dummy PDF for testing if you don't have one
@@ -0,0 +1,50 @@
+# Threaded pipeline stages connected by bounded queues # pipeline.py
+import queue
+import threading
+
+# Pages buffered between pipeline stages; bounds memory when one stage runs ahead
+PIPELINE_QUEUE_SIZE = 8
+
+def start_stage(name: str, produce, output: queue.Queue, stop: threading.Event, errors: list) -> threading.Thread:
+    """
+    Runs one pipeline stage in a daemon thread, putting every item produce() yields
+    on the output queue and a None sentinel when it is done (or fails).
+
+    Errors are recorded in errors as (name, exception). When stop is set the
+    stage gives up instead of blocking on a full queue, but still delivers the
+    sentinel so a stage reading from the queue isn't left waiting forever.
+    """
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                output.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def finish():
+        if put(None):
+            return
+        # Stopped early: the items still queued won't be used, so drop them to
+        # make room (this stage is the queue's only producer)
+        while True:
+            try:
+                output.get_nowait()
+            except queue.Empty:
+                break
+        output.put_nowait(None)
+
+    def run():
+        try:
+            for item in produce():
+                if not put(item):
+                    return
+        except Exception as e:
+            errors.append((name, e))
+        finally:
+            finish()
+
+    thread = threading.Thread(target=run, name=f"pipeline-{name}", daemon=True)
+    thread.start()
+    return thread
@@ -3,8 +3,14 @@
 Preview the contents of the generated Excel file.
 """
 
-import pandas as pd
 import os
+from itertools import islice
+
+def _format_rows(columns, rows):
+    """Lays out a header and rows as right-aligned text columns (empty cells left blank)"""
+    table = [["" if value is None else str(value) for value in row] for row in [columns] + rows]
+    widths = [max(len(row[i]) for row in table if i < len(row)) for i in range(len(columns))]
+    return "\n".join(" ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in table)
 
 def preview_excel(excel_path):
     """Preview the Excel file contents"""
@@ -13,23 +19,36 @@ def preview_excel(excel_path):
             print(f"Excel file not found: {excel_path}")
             return
         
+        # Imported only once there is a file to read
+        from openpyxl import load_workbook
+
         print(f"Reading Excel file: {excel_path}")
         
-        # Read all sheets
-        excel_file = pd.ExcelFile(excel_path)
-        print(f"Found {len(excel_file.sheet_names)} sheet(s): {excel_file.sheet_names}")
-        
-        for sheet_name in excel_file.sheet_names:
-            print(f"\n=== Sheet: {sheet_name} ===")
-            df = pd.read_excel(excel_path, sheet_name=sheet_name)
-            print(f"Shape: {df.shape} (rows, columns)")
-            print(f"Columns: {list(df.columns)}")
+        # Read-only mode streams rows from the sheet XML as they are iterated,
+        # so only the header and the rows shown are ever parsed
+        workbook = load_workbook(excel_path, read_only=True, data_only=True)
+        try:
+            print(f"Found {len(workbook.sheetnames)} sheet(s): {workbook.sheetnames}")
             
-            print("\nFirst 10 rows:")
-            print(df.head(10).to_string(index=False))
-            
-            if len(df) > 10:
-                print(f"\n... and {len(df) - 10} more rows")
+            for sheet in workbook.worksheets:
+                print(f"\n=== Sheet: {sheet.title} ===")
+                # The row count comes from the sheet's recorded dimensions
+                max_row = sheet.max_row
+                rows = sheet.iter_rows(values_only=True)
+                columns = list(next(rows, ()))
+                preview = list(islice(rows, 10))
+                n_rows = max(max_row - 1, 0) if max_row else len(preview)  # Minus the header row
+                print(f"Shape: ({n_rows}, {len(columns)}) (rows, columns)")
+                print(f"Columns: {columns}")
+                
+                print("\nFirst 10 rows:")
+                print(_format_rows(columns, preview))
+                
+                if n_rows > 10:
+                    print(f"\n... and {n_rows - 10} more rows")
+        finally:
+            # Read-only workbooks keep the file open until closed
+            workbook.close()
                 
     except Exception as e:
         print(f"Error reading Excel file: {e}")
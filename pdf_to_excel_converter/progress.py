@@ -0,0 +1,33 @@
+# Per-page progress reporting for the OCR loops # progress.py
+import sys
+
+try:
+    # Optional: one redrawn progress line instead of a printed line per page
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+class PageProgress:
+    """
+    Reports OCR progress one page at a time: a tqdm bar (refreshed at most
+    every few tenths of a second) when tqdm is installed, otherwise a
+    "Processing image i/total" line per page as before.
+    """
+    def __init__(self, total: int, desc: str = "OCR"):
+        self.total = total
+        self.done = 0
+        # Bound to the current stdout so output redirected by the daemon includes the bar
+        self.bar = tqdm(total=total, desc=desc, unit="page", file=sys.stdout) if tqdm is not None else None
+
+    def update(self, name: str):
+        """Counts one more page, named name"""
+        self.done += 1
+        if self.bar is not None:
+            self.bar.set_postfix_str(name, refresh=False)
+            self.bar.update()
+        else:
+            print(f"    Processing image {self.done}/{self.total}: {name}")
+
+    def close(self):
+        if self.bar is not None:
+            self.bar.close()
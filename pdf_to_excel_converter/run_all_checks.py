@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Run every Excel output check in parallel.
+
+Each check runs in its own worker process; output is captured per check and
+printed in order so the reports don't interleave.
+"""
+
+import io
+import sys
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+from check_excel import CHECKS, run_check
+
+def _run_one(name: str, pretty: bool) -> str:
+    """Run a single check and return everything it printed"""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        run_check(name, pretty=pretty)
+    return out.getvalue()
+
+def run_all_checks(names=None, pretty: bool = False, max_workers=None):
+    """Run the given checks (all of them by default) across a process pool"""
+    names = list(names or CHECKS)
+    with ProcessPoolExecutor(max_workers=max_workers or len(names)) as executor:
+        for output in executor.map(_run_one, names, [pretty] * len(names)):
+            sys.stdout.write(output)
+            sys.stdout.write('\n')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run all Excel output checks in parallel.")
+    parser.add_argument("--pretty", action="store_true",
+                        help="Print aligned tables instead of tab-separated values.")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes (default: one per check).")
+    args = parser.parse_args(argv)
+
+    run_all_checks(pretty=args.pretty, max_workers=args.jobs)
+
+if __name__ == "__main__":
+    main()
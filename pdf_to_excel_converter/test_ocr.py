@@ -5,28 +5,39 @@ Simple test script to verify PaddleOCR is working correctly.
 
 import os
 import sys
-from paddleocr import PaddleOCR
 
-def test_ocr():
-    """Test OCR functionality with a simple setup"""
+from config import TEMP_IMAGE_DIR, TEMP_IMAGE_EXTENSION, OCR_CONFIG
+from ocr_processor import get_paddle_ocr
+from pdf_processor import render_page
+
+def test_ocr(pdf_path=None):
+    """
+    Test OCR functionality with a simple setup.
+
+    Given a PDF, its first page is rendered in memory and its pixels handed to
+    PaddleOCR directly; otherwise a page image left by an earlier run is used.
+    """
     print("Testing PaddleOCR setup...")
     
     try:
-        # Initialize with minimal configuration
+        # Initialize with minimal configuration (set USE_HPI=1 for high-performance inference)
         print("Initializing PaddleOCR...")
-        ocr = PaddleOCR(use_angle_cls=True, lang='en')
+        ocr = get_paddle_ocr(lang='en', use_angle_cls=OCR_CONFIG["use_angle_cls"])
         print("PaddleOCR initialized successfully!")
         
-        # Check if we have an image to test with
-        image_path = "temp_images/page_1.png"
-        if not os.path.exists(image_path):
-            print(f"Test image not found: {image_path}")
-            return False
-            
-        print(f"Testing OCR on: {image_path}")
+        if pdf_path:
+            print(f"Testing OCR on page 1 of: {pdf_path}")
+            image = render_page(pdf_path, 1).pixels
+        else:
+            # Check if we have an image to test with
+            image = os.path.join(TEMP_IMAGE_DIR, f"page_1.{TEMP_IMAGE_EXTENSION}")
+            if not os.path.exists(image):
+                print(f"Test image not found: {image}")
+                return False
+            print(f"Testing OCR on: {image}")
         
         # Run OCR
-        result = ocr.ocr(image_path)
+        result = ocr.ocr(image)
         
         if result and len(result) > 0 and result[0]:
             print(f"OCR successful! Found {len(result[0])} text elements.")
@@ -50,7 +61,7 @@ def test_ocr():
         return False
 
 if __name__ == "__main__":
-    success = test_ocr()
+    success = test_ocr(sys.argv[1] if len(sys.argv) > 1 else None)
     if success:
         print("\n✅ OCR test passed!")
         sys.exit(0)
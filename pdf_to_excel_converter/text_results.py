@@ -0,0 +1,52 @@
+# Container for the text detections of one OCR'd page # text_results.py
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Union
+
+class TextResults:
+    """
+    The text detections of one page stored as parallel arrays (struct-of-arrays).
+
+    Detection i is (bbox[i], text[i], confidence[i]): bbox is an (N, 4, 2) int32
+    array of [x, y] corners, text a list of strings and confidence a float64
+    array. Mappers can take the box and confidence arrays as they are instead
+    of rebuilding them from per-detection dicts.
+
+    Indexing with an int and iterating still give the {'bbox', 'text',
+    'confidence'} dicts the OCR processors used to return, and slicing gives
+    another TextResults, so code written against lists of dicts keeps working.
+    """
+    __slots__ = ('bbox', 'text', 'confidence')
+
+    def __init__(self, bbox: np.ndarray, text: List[str], confidence: np.ndarray):
+        self.bbox = bbox
+        self.text = text
+        self.confidence = confidence
+
+    @classmethod
+    def empty(cls) -> 'TextResults':
+        """A page without any detections"""
+        return cls(np.zeros((0, 4, 2), dtype=np.int32), [], np.zeros(0, dtype=np.float64))
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, 'TextResults']:
+        if isinstance(index, slice):
+            return TextResults(self.bbox[index], self.text[index], self.confidence[index])
+        return {
+            "bbox": self.bbox[index].tolist(),
+            "text": self.text[index],
+            "confidence": float(self.confidence[index])
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        for bbox, text, confidence in zip(self.bbox.tolist(), self.text, self.confidence.tolist()):
+            yield {"bbox": bbox, "text": text, "confidence": confidence}
+
+def mean_confidence(text_results: Union[TextResults, List[Dict]]) -> Optional[float]:
+    """The mean confidence of a page's text results, or None if it has none"""
+    if not len(text_results):
+        return None
+    if isinstance(text_results, TextResults):
+        return float(text_results.confidence.mean())
+    return float(np.mean([result.get("confidence", 0.0) for result in text_results]))
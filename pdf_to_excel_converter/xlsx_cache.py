@@ -0,0 +1,137 @@
+# Cached Excel reads for the check scripts # xlsx_cache.py
+import os
+import glob
+import hashlib
+from itertools import islice
+from typing import Any, List, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from config import OUTPUT_DIR
+
+CACHE_DIR = os.path.join(OUTPUT_DIR, ".cache")
+
+def _short_hash(key: str) -> str:
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+def _cache_prefix(excel_path: str) -> str:
+    """Pickle path prefix shared by every cached version of an Excel file"""
+    return os.path.join(CACHE_DIR, _short_hash(os.path.abspath(excel_path)))
+
+def _cache_path(excel_path: str) -> str:
+    """Build the pickle path for the current version of an Excel file"""
+    st = os.stat(excel_path)
+    version = _short_hash(f"{st.st_mtime_ns}:{st.st_size}")
+    return f"{_cache_prefix(excel_path)}-{version}.pkl"
+
+def _remove_stale_entries(excel_path: str, keep: str):
+    """Deletes the cached copies of earlier versions of an Excel file"""
+    for path in glob.glob(f"{glob.escape(_cache_prefix(excel_path))}-*.pkl"):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _column_names(headers: List[Any]) -> List[Any]:
+    """
+    Names the columns the way pd.read_excel does: a blank header becomes
+    'Unnamed: <i>', and repeats of a name get '.1', '.2', ... appended, so
+    every column can be selected on its own.
+    """
+    names = [f"Unnamed: {i}" if name is None else name for i, name in enumerate(headers)]
+    taken = set(names)
+    counts = {}
+    for i, name in enumerate(names):
+        count = counts.get(name, 0)
+        base = name
+        while count > 0:
+            # Suffixes that another header already uses are skipped
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            count = count + 1 if name in taken else counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+def read_xlsx_rows(excel_path: str) -> Tuple[List[Any], List[tuple]]:
+    """
+    Streams the active sheet of an Excel file with openpyxl's read-only parser.
+
+    Returns:
+        Tuple[List[Any], List[tuple]]: The column names (see _column_names) and the remaining data rows.
+    """
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = _column_names(list(next(rows, ())))
+        return headers, list(rows)
+    finally:
+        # Read-only workbooks keep the file handle open until closed
+        wb.close()
+
+def read_xlsx_sample(excel_path: str, sample_rows: int) -> Tuple[List[Any], List[tuple], Tuple[int, int]]:
+    """
+    Streams the header and at most sample_rows data rows of the active sheet.
+
+    The full sheet shape comes from the sheet's stored dimensions when present,
+    so the cost does not grow with the file; otherwise the remaining rows are
+    counted without being kept.
+
+    Returns:
+        Tuple[List[Any], List[tuple], Tuple[int, int]]: The column names, the sampled
+        data rows and the (rows, columns) shape of the whole sheet, excluding the header.
+    """
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        rows = ws.iter_rows(values_only=True)
+        headers = _column_names(list(next(rows, ())))
+        sample = list(islice(rows, sample_rows))
+        if ws.max_row is not None:
+            n_rows = max(ws.max_row - 1, 0)
+        else:
+            n_rows = len(sample) + sum(1 for _ in rows)
+        n_cols = ws.max_column if ws.max_column is not None else len(headers)
+        return headers, sample, (n_rows, n_cols)
+    finally:
+        wb.close()
+
+def cached_read_excel(excel_path: str) -> pd.DataFrame:
+    """
+    Reads the active sheet of an Excel file, reusing a pickled copy when the file
+    has not changed since the last read.
+
+    The cache key is the file's absolute path, modification time and size, so
+    rewriting the workbook invalidates the cached copy automatically; the copy
+    of the previous version is deleted when the new one is written, so only
+    one entry per workbook is kept.
+
+    Args:
+        excel_path (str): The path to the Excel file.
+
+    Returns:
+        pd.DataFrame: The sheet contents.
+    """
+    cache_path = _cache_path(excel_path)
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_pickle(cache_path)
+        except Exception:
+            # Corrupt or incompatible cache entry; fall through and rebuild it
+            pass
+
+    headers, rows = read_xlsx_rows(excel_path)
+    df = pd.DataFrame(rows, columns=headers)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+        _remove_stale_entries(excel_path, keep=cache_path)
+    except OSError as e:
+        print(f"[WARNING] Could not write Excel cache for {excel_path}: {e}")
+
+    return df